@@ -1,32 +1,48 @@
 import os
+import sys
 import polars as pl
 
 # Locate datasets directory
 datasets_dir = os.path.abspath(os.path.join(__file__, '..', '..', 'datasets'))
 
+# Shared helpers live in utils/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..')))
+from utils.ids import decode_ids, encode_ids
+from utils.loader import load_dataset
+from utils.storage import write_dataset
+
 # Load cleaned transactions, clients, and assets
-tx = pl.read_csv(f"{datasets_dir}/cleaned_transactions.csv")
-clients = pl.read_csv(f"{datasets_dir}/clients.csv")
-assets = pl.read_parquet(f"{datasets_dir}/assets.parquet")
+# encode_ids turns "C0001"-style IDs into integer keys, so joins compare integers,
+# and records the zero padding of each ID column in widths for decode_ids
+widths = {}
+tx = encode_ids(load_dataset(datasets_dir, "cleaned_transactions"), widths=widths)
+clients = encode_ids(load_dataset(datasets_dir, "clients"), widths=widths)
+assets = encode_ids(load_dataset(datasets_dir, "assets"), widths=widths)
 
-# Join transactions with client and asset metadata
+# Join transactions with client and asset metadata on the integer keys
+# Keeping the left row order keeps the joined rows in the order of tx
 df = (
-    tx.join(clients, on="client_id", how="inner")
-      .join(assets, on="asset_id", how="inner")
+    tx.join(clients, on="client_id", how="inner", maintain_order="left")
+      .join(assets, on="asset_id", how="inner", maintain_order="left")
 )
 print(f"Joined records: {df.height}")
 
 # Filter high-value transactions > 15000
 high = df.filter(pl.col("amount") > 15000)
 print("High-value sample:")
-print(high.head())
+print(decode_ids(high.head(), widths))
 
 # Select key columns and sort by date
+# When the loader has marked tx as sorted by date this sort is a no-op; it
+# still orders the output when the source rows are not in date order
 result = df.select([
     "transaction_id", "client_id", "name", "asset_type", "amount", "date"
 ]).sort("date")
+
+# Turn the keys back into prefixed string IDs for output
+result = decode_ids(result, widths)
 print("Sorted sample:")
 print(result.head())
 
 # Save joined output
-result.write_csv(f"{datasets_dir}/joined_transactions.csv")
\ No newline at end of file
+write_dataset(result, datasets_dir, "joined_transactions")
\ No newline at end of file
@@ -1,30 +1,50 @@
 import os
+import sys
 import polars as pl
-import time
 
 # Locate datasets directory
 datasets_dir = os.path.abspath(os.path.join(__file__, '..', '..', 'datasets'))
 
+# Shared helpers live in utils/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..')))
+from utils.bench import report, run_benchmark
+from utils.storage import read_dataset, scan_dataset
+
+def eager_query():
+    df = read_dataset(datasets_dir, "transactions")
+    return df.filter(pl.col("amount") > 0).select(pl.sum("amount"))
+
+def lazy_query():
+    lazy_df = scan_dataset(datasets_dir, "transactions")
+    return (
+        lazy_df
+        .filter(pl.col("amount") > 0)
+        .select(pl.sum("amount"))
+        .collect()
+    )
+
+# Each query is timed over several runs after warm-up; a single run is mostly noise
 # Eager execution
 print("--- EAGER EXECUTION ---")
-start = time.time()
-df = pl.read_csv(f"{datasets_dir}/transactions.csv")
-eager_result = df.filter(pl.col("amount") > 0).select(pl.sum("amount"))
-eager_time = time.time() - start
-print(f"Eager sum: {eager_result[0,0]}, time: {eager_time:.4f}s")
+eager_run = run_benchmark("lazy_vs_eager [eager]", eager_query, repeat=10, warmups=2)
+eager_time = eager_run["stats"]["median"]
+print(f"Eager sum: {eager_query()[0,0]}, median time: {eager_time:.4f}s "
+      f"(p95 {eager_run['stats']['p95']:.4f}s)")
 
 # Lazy execution
 print("--- LAZY EXECUTION ---")
-start = time.time()
-lazy_df = pl.scan_csv(f"{datasets_dir}/transactions.csv")
-lazy_result = (
-    lazy_df
-    .filter(pl.col("amount") > 0)
-    .select(pl.sum("amount"))
-    .collect()
-)
-lazy_time = time.time() - start
-print(f"Lazy sum: {lazy_result[0,0]}, time: {lazy_time:.4f}s")
+lazy_run = run_benchmark("lazy_vs_eager [lazy]", lazy_query, repeat=10, warmups=2)
+lazy_time = lazy_run["stats"]["median"]
+print(f"Lazy sum: {lazy_query()[0,0]}, median time: {lazy_time:.4f}s "
+      f"(p95 {lazy_run['stats']['p95']:.4f}s)")
 
 # Performance comparison
-print(f"\nLazy vs Eager speedup: {eager_time/lazy_time:.2f}x")
\ No newline at end of file
+print(f"\nLazy vs Eager speedup: {eager_time/lazy_time:.2f}x")
+
+# Append to the shared benchmark history and check against the baseline
+report(
+    [eager_run, lazy_run],
+    f"{datasets_dir}/benchmark_history.jsonl",
+    f"{datasets_dir}/benchmark_baseline.json",
+    update_baseline="--update-baseline" in sys.argv,
+)
@@ -0,0 +1,134 @@
+"""
+04_streaming_data_cleaning.py
+Out-of-core version of 01_data_cleaning.py.
+
+01_data_cleaning.py reads the whole transactions file into memory, cleans it and
+writes a second full copy. Here the same cleaning steps are expressed as a lazy
+query over a scan of the transactions and sunk straight to disk with the
+streaming engine, which processes the input in fixed-size chunks. Peak memory
+depends on the chunk size, not on the input size, so this works for files far
+larger than RAM.
+
+By default the transactions are read in the configured storage format
+(LEARN_POLARS_FORMAT, see utils/storage.py); --source takes any CSV, Parquet or
+IPC file, glob or hive directory instead.
+
+Usage:
+    python 01_basics/04_streaming_data_cleaning.py
+    LEARN_POLARS_FORMAT=parquet python 01_basics/04_streaming_data_cleaning.py
+
+    # Peak-memory check on a multi-GB input: 50M transactions are ~3 GB of CSV
+    # (tests/test_streaming_cleaning.py runs the same check under pytest)
+    python datasets/generate_datasets.py --scale 50 --format csv
+    python 01_basics/04_streaming_data_cleaning.py --source "datasets/scale_sf50/transactions/*.csv" \
+        --output-format parquet --chunk-size 100000 --max-rss-mb 1024
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+import polars as pl
+
+# Locate datasets directory
+datasets_dir = os.path.abspath(os.path.join(__file__, '..', '..', 'datasets'))
+
+# Shared helpers live in utils/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..')))
+from utils.bench import peak_rss_mb
+from utils.loader import TRANSACTION_SCHEMA
+from utils.storage import EXTENSIONS, FORMATS, data_format, dataset_path, hive_glob
+
+
+def clean_transactions(lf):
+    """The cleaning steps of 01_data_cleaning.py as a lazy query"""
+    return (
+        lf.drop_nulls()
+          .filter(pl.col("amount") > 0)
+          .with_columns(pl.col("amount").round(2))
+    )
+
+
+def source_format(source):
+    """Storage format of a --source path from its file extension"""
+    extension = source.rsplit(".", 1)[-1].lower()
+    for fmt, ext in EXTENSIONS.items():
+        if extension in (fmt, ext):
+            return fmt
+    raise ValueError(f"Cannot tell the format of {source!r}; pass --format")
+
+
+def scan_transactions(source, fmt):
+    """Lazy scan of a transactions file, glob or hive directory with the declared schema"""
+    if os.path.isdir(source):
+        source = hive_glob(source, fmt)
+    if fmt == "csv":
+        # Declared schema: no inference pass, dates parsed while scanning
+        return pl.scan_csv(source, schema=TRANSACTION_SCHEMA)
+    scan = pl.scan_parquet if fmt == "parquet" else pl.scan_ipc
+    # The year/month partition columns are not part of the cleaned output
+    return (
+        scan(source, hive_partitioning=False)
+          .select(list(TRANSACTION_SCHEMA))
+          .cast(TRANSACTION_SCHEMA)
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Streaming transaction cleaning")
+    parser.add_argument("--source", default=None,
+                        help="file, glob or hive directory (default: the transactions dataset)")
+    parser.add_argument("--format", choices=FORMATS, default=None,
+                        help="format of --source (default: from its extension)")
+    parser.add_argument("--output-format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--output", default=None,
+                        help="output file (default: datasets/cleaned_transactions_streaming.<fmt>)")
+    parser.add_argument("--chunk-size", type=int, default=50_000,
+                        help="rows per streaming chunk (also the Parquet row group size)")
+    parser.add_argument("--max-rss-mb", type=float, default=None,
+                        help="fail if peak RSS exceeds this budget")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.source:
+        fmt = args.format or source_format(args.source)
+        source = args.source
+    else:
+        fmt = data_format("transactions", args.format)
+        source = dataset_path(datasets_dir, "transactions", fmt)
+    output = args.output or f"{datasets_dir}/cleaned_transactions_streaming.{args.output_format}"
+
+    # Chunk size used by the streaming engine for every operator in the plan
+    pl.Config.set_streaming_chunk_size(args.chunk_size)
+
+    tx_lazy = scan_transactions(source, fmt)
+    cleaned = clean_transactions(tx_lazy)
+
+    print("Streaming plan:")
+    print(cleaned.explain(engine="streaming"))
+
+    start = time.perf_counter()
+    if args.output_format == "parquet":
+        cleaned.sink_parquet(output, row_group_size=args.chunk_size, engine="streaming")
+    else:
+        cleaned.sink_csv(output, engine="streaming")
+    elapsed = time.perf_counter() - start
+
+    # Count output rows without loading the data (Parquet answers from metadata)
+    if args.output_format == "parquet":
+        rows = pl.scan_parquet(output).select(pl.len()).collect().item()
+    else:
+        rows = pl.scan_csv(output).select(pl.len()).collect().item()
+
+    files = glob.glob(hive_glob(source, fmt) if os.path.isdir(source) else source, recursive=True)
+    size_mb = sum(os.path.getsize(path) for path in files) / 1024 ** 2
+    peak = peak_rss_mb()
+    print(f"\nInput: {size_mb:,.1f} MB, cleaned records: {rows:,}")
+    print(f"Streaming clean took {elapsed:.2f}s -> {output}")
+    if peak is not None:
+        print(f"Peak RSS: {peak:,.1f} MB")
+
+    if args.max_rss_mb is not None and peak is not None and peak > args.max_rss_mb:
+        sys.exit(f"Peak RSS {peak:,.1f} MB exceeded the {args.max_rss_mb:,.1f} MB budget")
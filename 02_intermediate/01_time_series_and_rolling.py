@@ -1,21 +1,42 @@
 import os
+import sys
+import argparse
 import polars as pl
 import matplotlib.pyplot as plt
 
 # Locate datasets directory
 datasets_dir = os.path.abspath(os.path.join(__file__, '..', '..', 'datasets'))
 
-# Load benchmark returns
-benchmarks = pl.read_csv(f"{datasets_dir}/benchmarks.csv")
+# Shared helpers live in utils/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..')))
+from utils.loader import load_dataset
+from utils.storage import write_dataset
+from utils.rolling import unseen_rows, update
 
-# Parse date column to Datetime
-benchmarks = benchmarks.with_columns([
-    pl.col('date').str.strptime(pl.Datetime, format='%Y-%m-%dT%H:%M:%S%.f').alias('date')
-])
+parser = argparse.ArgumentParser(description="Rolling statistics of benchmark returns")
+parser.add_argument("--incremental", action="store_true",
+                    help="append statistics for new rows only (see utils/rolling.py)")
+args = parser.parse_args()
+
+# Load benchmark returns ('date' is loaded as Datetime by the typed loader)
+benchmarks = load_dataset(datasets_dir, "benchmarks")
 
 # Sort by date
 benchmarks = benchmarks.sort('date')
 
+# Incremental mode: only rows newer than the last run are computed and appended
+# as a new part file; the window tail and EWMA state are kept in state.json
+# next to the parts. tests/test_rolling.py checks this against a full recompute.
+if args.incremental:
+    out_dir = os.path.join(datasets_dir, "rolling_benchmarks_incremental")
+    new_rows = unseen_rows(benchmarks, out_dir)
+    # On the first run the history is replayed in monthly batches, as it would have arrived
+    batches = new_rows.with_columns(pl.col('date').dt.truncate('1mo').alias('_month'))
+    for batch in batches.partition_by('_month', maintain_order=True, include_key=False):
+        update(batch, out_dir)
+    print(f"Appended {new_rows.height} new rows to {out_dir}")
+    sys.exit(0)
+
 # 7-day rolling mean and 30-day rolling std
 rolling_stats = benchmarks.with_columns([
     pl.col('benchmark_return').rolling_mean(window_size=7).alias('rolling_mean_7d'),
@@ -30,4 +51,4 @@ rolling_stats = rolling_stats.with_columns([
 ])
 
 # Save rolling stats
-rolling_stats.write_parquet(f"{datasets_dir}/rolling_benchmarks.parquet")
\ No newline at end of file
+write_dataset(rolling_stats, datasets_dir, "rolling_benchmarks")
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+import sys
 import polars as pl
 import numpy as np
 import matplotlib.pyplot as plt
@@ -6,9 +7,16 @@ import matplotlib.pyplot as plt
 # Locate datasets directory
 datasets_dir = os.path.abspath(os.path.join(__file__, '..', '..', 'datasets'))
 
+# Shared helpers live in utils/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..')))
+from utils.ids import encode_ids
+from utils.loader import load_dataset
+from utils.storage import write_dataset
+
 # Load cleaned transactions and assets
-tx = pl.read_csv(f"{datasets_dir}/cleaned_transactions.csv")
-assets = pl.read_parquet(f"{datasets_dir}/assets.parquet")
+# IDs are encoded as integer keys so the join below compares integers, not strings
+tx = encode_ids(load_dataset(datasets_dir, "cleaned_transactions"))
+assets = encode_ids(load_dataset(datasets_dir, "assets"))
 
 # Join to get price info
 df = tx.join(assets, on="asset_id", how="inner")
@@ -16,11 +24,6 @@ df = tx.join(assets, on="asset_id", how="inner")
 # Compute trade value = amount * price
 df = df.with_columns((pl.col("amount") * pl.col("price")).alias("trade_value"))
 
-# Ensure 'date' column is parsed as Datetime before extracting date part
-if df['date'].dtype != pl.Datetime:
-    df = df.with_columns(
-        pl.col('date').str.strptime(pl.Datetime, format='%Y-%m-%dT%H:%M:%S%.f').alias('date')
-    )
 # Add a 'trade_date' column (extract date part from datetime)
 df = df.with_columns(
     pl.col("date").dt.date().alias("trade_date")
@@ -31,7 +34,7 @@ daily_perf = (
     df.group_by("trade_date")
       .agg([
           pl.sum("trade_value").alias("daily_trade_value"),
-          pl.count().alias("num_trades")
+          pl.len().alias("num_trades")
       ])
       .sort("trade_date")
 )
@@ -61,4 +64,4 @@ print(f"Daily Volatility: {std_daily_return:.2f}%")
 print(f"Annualized Sharpe Ratio: {sharpe:.2f}")
 
 # Save results
-daily_perf.write_csv(f"{datasets_dir}/portfolio_performance.csv")
\ No newline at end of file
+write_dataset(daily_perf, datasets_dir, "portfolio_performance")
\ No newline at end of file
@@ -1,17 +1,28 @@
 import os
+import sys
 import polars as pl
 import matplotlib.pyplot as plt
 
 # Locate datasets directory
 datasets_dir = os.path.abspath(os.path.join(__file__, '..', '..', 'datasets'))
 
+# Shared helpers live in utils/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..')))
+from utils.batch import QueryBatch
+from utils.ids import encode_ids
+from utils.loader import load_dataset
+from utils.storage import write_dataset
+
 # Load cleaned transactions, assets, and benchmarks
-tx = pl.read_csv(f"{datasets_dir}/cleaned_transactions.csv")
-assets = pl.read_parquet(f"{datasets_dir}/assets.parquet")
-benchmarks = pl.read_csv(f"{datasets_dir}/benchmarks.csv")
+# IDs are encoded as integer keys so the join below compares integers, not strings
+tx = encode_ids(load_dataset(datasets_dir, "cleaned_transactions"))
+assets = encode_ids(load_dataset(datasets_dir, "assets"))
+benchmarks = load_dataset(datasets_dir, "benchmarks")
 
 # Join transactions with assets
-df = tx.join(assets, on="asset_id", how="inner")
+# Kept lazy: both attributions below reuse this join, and collecting them as
+# one batch computes it once
+df = tx.lazy().join(assets.lazy(), on="asset_id", how="inner")
 
 # Compute trade value = amount * price
 df = df.with_columns([
@@ -24,29 +35,35 @@ asset_type_attr = (
     df.group_by("asset_type")
       .agg([
           pl.sum("trade_value").alias("total_value"),
-          pl.count().alias("num_trades")
+          pl.len().alias("num_trades")
       ])
 )
 
-# Calculate percentage attribution
-total = asset_type_attr["total_value"].sum()
-asset_type_attr = asset_type_attr.with_columns([
-    (pl.col("total_value") / total * 100).alias("pct_attribution")
-])
-
-print("Return attribution by asset type:")
-print(asset_type_attr)
-
 # ATTRIBUTION BY REGION
 # ====================
 region_attr = (
     df.group_by("region")
       .agg([
           pl.sum("trade_value").alias("total_value"),
-          pl.count().alias("num_trades")
+          pl.len().alias("num_trades")
       ])
 )
 
+batch = QueryBatch()
+batch.add("asset_type", asset_type_attr)
+batch.add("region", region_attr)
+attribution = batch.collect()
+asset_type_attr, region_attr = attribution["asset_type"], attribution["region"]
+
+# Calculate percentage attribution
+total = asset_type_attr["total_value"].sum()
+asset_type_attr = asset_type_attr.with_columns([
+    (pl.col("total_value") / total * 100).alias("pct_attribution")
+])
+
+print("Return attribution by asset type:")
+print(asset_type_attr)
+
 # Calculate percentage attribution
 region_attr = region_attr.with_columns([
     (pl.col("total_value") / total * 100).alias("pct_attribution")
@@ -56,5 +73,5 @@ print("\nReturn attribution by region:")
 print(region_attr)
 
 # Save results
-asset_type_attr.write_csv(f"{datasets_dir}/asset_type_attribution.csv")
-region_attr.write_csv(f"{datasets_dir}/region_attribution.csv")
\ No newline at end of file
+write_dataset(asset_type_attr, datasets_dir, "asset_type_attribution")
+write_dataset(region_attr, datasets_dir, "region_attribution")
\ No newline at end of file
@@ -1,10 +1,15 @@
 import os
+import sys
 import polars as pl
 import json
 
 # Locate datasets directory
 datasets_dir = os.path.abspath(os.path.join(__file__, '..', '..', 'datasets'))
 
+# Shared helpers live in utils/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..')))
+from utils.storage import write_dataset
+
 # Create a nested JSON-like structure for portfolio holdings
 nested_data = [
     {"client_id": "C0001", "portfolios": [
@@ -80,5 +85,5 @@ print("Exploded portfolios:")
 print(exploded)
 
 # Save results
-final.write_csv(f"{datasets_dir}/exploded_holdings.csv")
-melted.write_csv(f"{datasets_dir}/melted_assets.csv")
\ No newline at end of file
+write_dataset(final, datasets_dir, "exploded_holdings")
+write_dataset(melted, datasets_dir, "melted_assets")
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""
+06_client_performance.py
+Daily performance and Sharpe ratio for every client in one lazy query.
+
+02_portfolio_performance.py computes a single firm-wide series and pulls
+mean()/std() into Python for the Sharpe ratio. Here utils/performance.py builds
+the same metrics per client and per client x asset_type as one lazy plan,
+collected with the streaming engine. --benchmark times it against the
+straightforward alternative: a Python loop over df.partition_by("client_id")
+running the firm-wide code once per client.
+
+Usage:
+    python 02_intermediate/06_client_performance.py
+    python 02_intermediate/06_client_performance.py --benchmark --rows 5000000 --clients 10000
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import polars as pl
+
+# Locate datasets directory
+datasets_dir = os.path.abspath(os.path.join(__file__, '..', '..', 'datasets'))
+
+# Shared helpers live in utils/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..')))
+from utils.ids import decode_ids, encode_ids
+from utils.loader import scan_typed
+from utils.performance import TRADING_DAYS, daily_performance, performance_summary, trade_values
+from utils.storage import write_dataset
+
+
+def build_frames(rows, n_clients, n_assets=1_000, days=500, seed=42):
+    """Synthetic transactions with integer keys, plus an asset price table"""
+    rng = np.random.default_rng(seed)
+    tx = pl.DataFrame({
+        "client_id": rng.integers(0, n_clients, rows).astype(np.uint32),
+        "asset_id": rng.integers(0, n_assets, rows).astype(np.uint32),
+        "amount": np.round(rng.normal(10000, 5000, rows), 2),
+        "date": np.datetime64("2020-01-01", "ms") + rng.integers(0, days, rows) * np.timedelta64(1, "D"),
+    })
+    assets = pl.DataFrame({
+        "asset_id": np.arange(n_assets, dtype=np.uint32),
+        "asset_type": rng.choice(["Equity", "Bond", "Commodity"], n_assets),
+        "price": np.round(rng.uniform(10, 500, n_assets), 2),
+    })
+    return tx, assets
+
+
+def loop_summary(trades):
+    """Per-client summary via a Python loop, one firm-wide computation per client"""
+    rows = []
+    for (client_id,), client in trades.partition_by("client_id", as_dict=True).items():
+        daily = (
+            client.group_by("trade_date")
+                  .agg(pl.sum("trade_value").alias("daily_trade_value"))
+                  .sort("trade_date")
+                  .with_columns(pl.cum_sum("daily_trade_value").alias("cumulative_value"))
+                  .with_columns(
+                      (pl.col("daily_trade_value") / pl.col("cumulative_value").shift(1) * 100)
+                      .alias("daily_return_pct")
+                  )
+        )
+        avg = daily["daily_return_pct"].mean()
+        std = daily["daily_return_pct"].std()
+        rows.append({
+            "client_id": client_id,
+            "avg_daily_return_pct": avg,
+            "sharpe_ratio": avg / std * np.sqrt(TRADING_DAYS) if avg is not None and std else None,
+        })
+    return pl.DataFrame(rows).sort("client_id")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Per-client performance and Sharpe ratios")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compare with a partition_by loop on synthetic data")
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--clients", type=int, default=10_000)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.benchmark:
+        tx, assets = build_frames(args.rows, args.clients)
+        print(f"Transactions: {tx.height:,} rows, {args.clients:,} clients")
+
+        start = time.perf_counter()
+        trades = trade_values(tx.lazy(), assets.lazy())
+        summary = performance_summary(daily_performance(trades, "client_id"), "client_id")
+        vectorized = summary.collect(engine="streaming")
+        vectorized_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        looped = loop_summary(trade_values(tx, assets))
+        loop_time = time.perf_counter() - start
+
+        diff = (vectorized["sharpe_ratio"] - looped["sharpe_ratio"]).abs().max()
+        assert diff is None or diff < 1e-9, f"Sharpe ratios differ by {diff}"
+        print(f"One lazy query:      {vectorized_time:.3f}s")
+        print(f"partition_by loop:   {loop_time:.3f}s")
+        print(f"Speedup:             {loop_time / vectorized_time:.1f}x")
+        sys.exit(0)
+
+    # Integer keys for the join and the per-client windows
+    widths = {}
+    tx = encode_ids(scan_typed(datasets_dir, "cleaned_transactions"), widths=widths)
+    assets = encode_ids(scan_typed(datasets_dir, "assets"), widths=widths)
+    trades = trade_values(tx, assets)
+
+    # Both granularities share one scan of the inputs and run on the streaming engine
+    client_daily = daily_performance(trades, "client_id")
+    client_summary, type_summary = pl.collect_all([
+        performance_summary(client_daily, "client_id"),
+        performance_summary(daily_performance(trades, ["client_id", "asset_type"]),
+                            ["client_id", "asset_type"]),
+    ], engine="streaming")
+
+    client_summary = decode_ids(client_summary, widths)
+    type_summary = decode_ids(type_summary, widths)
+    print("Per-client performance:")
+    print(client_summary.head())
+    print("\nPer client x asset_type performance:")
+    print(type_summary.head())
+
+    write_dataset(client_summary, datasets_dir, "client_performance")
+    write_dataset(type_summary, datasets_dir, "client_asset_type_performance")
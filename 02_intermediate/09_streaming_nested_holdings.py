@@ -0,0 +1,97 @@
+"""
+09_streaming_nested_holdings.py
+Streaming ingestion of a large nested NDJSON holdings feed.
+
+04_nested_data_and_explode.py builds the nested holdings in memory and
+flattens them step by step, materializing a full copy at each step. Here a
+generated feed of --clients clients is scanned with scan_ndjson and a declared
+nested schema, flattened client -> portfolio -> holding in one lazy plan
+(utils/holdings.py) and sunk to Parquet with the streaming engine in
+--chunk-size batches. The script reports throughput and peak memory.
+
+Usage:
+    python 02_intermediate/09_streaming_nested_holdings.py --clients 1000000
+    python 02_intermediate/09_streaming_nested_holdings.py --source feed.ndjson --output holdings.parquet
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import polars as pl
+
+# Locate datasets directory
+datasets_dir = os.path.abspath(os.path.join(__file__, '..', '..', 'datasets'))
+
+# Shared helpers live in utils/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..')))
+from utils.bench import peak_rss_mb
+from utils.holdings import flatten_holdings, scan_holdings
+from utils.ids import format_ids, id_width
+
+
+def nested_chunk(rng, first_client, n_clients, n_assets):
+    """Clients with 1-3 portfolios of 1-10 holdings each, in the nested layout"""
+    ports_per_client = rng.integers(1, 4, n_clients)
+    n_ports = int(ports_per_client.sum())
+    holdings_per_port = rng.integers(1, 11, n_ports)
+    n_holdings = int(holdings_per_port.sum())
+    clients = np.repeat(np.arange(first_client, first_client + n_clients), ports_per_client)
+    ports = np.arange(n_ports) + first_client * 3
+    flat = pl.DataFrame({
+        "client_id": format_ids("C", np.repeat(clients, holdings_per_port), 7),
+        "port_id": format_ids("P", np.repeat(ports, holdings_per_port), 0),
+        "holdings": format_ids("A", rng.integers(0, n_assets, n_holdings), id_width(n_assets, 4)),
+    })
+    return (
+        flat.group_by(["client_id", "port_id"], maintain_order=True)
+            .agg(pl.col("holdings"))
+            .group_by("client_id", maintain_order=True)
+            .agg(pl.struct(["port_id", "holdings"]).alias("portfolios"))
+    )
+
+
+def write_feed(path, n_clients, n_assets=5_000, chunk_clients=100_000, seed=42):
+    """Write a nested NDJSON feed chunk by chunk"""
+    rng = np.random.default_rng(seed)
+    with open(path, "wb") as f:
+        for first in range(0, n_clients, chunk_clients):
+            nested_chunk(rng, first, min(chunk_clients, n_clients - first), n_assets).write_ndjson(f)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Streaming nested NDJSON holdings ingestion")
+    parser.add_argument("--clients", type=int, default=200_000,
+                        help="clients in the generated feed (ignored with --source)")
+    parser.add_argument("--source", default=None, help="existing NDJSON holdings feed")
+    parser.add_argument("--output", default=f"{datasets_dir}/holdings_streaming.parquet")
+    parser.add_argument("--chunk-size", type=int, default=100_000,
+                        help="rows per streaming chunk (also the Parquet row group size)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    source = args.source or f"{datasets_dir}/holdings_feed.ndjson"
+    if args.source is None:
+        start = time.perf_counter()
+        write_feed(source, args.clients)
+        print(f"Generated {args.clients:,} clients in {time.perf_counter() - start:.2f}s -> {source}")
+
+    pl.Config.set_streaming_chunk_size(args.chunk_size)
+    flat = flatten_holdings(scan_holdings(source))
+    print("\nStreaming plan:")
+    print(flat.explain(engine="streaming"))
+
+    start = time.perf_counter()
+    flat.sink_parquet(args.output, row_group_size=args.chunk_size, engine="streaming")
+    elapsed = time.perf_counter() - start
+
+    rows = pl.scan_parquet(args.output).select(pl.len()).collect().item()
+    size_mb = os.path.getsize(source) / 1024 ** 2
+    print(f"\nInput: {size_mb:,.1f} MB NDJSON -> {rows:,} holdings in {elapsed:.2f}s")
+    print(f"Throughput: {size_mb / elapsed:,.1f} MB/s, {rows / elapsed / 1e6:,.2f}M holdings/s")
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"Peak RSS: {peak:,.1f} MB")
+    print(pl.scan_parquet(args.output).head().collect())
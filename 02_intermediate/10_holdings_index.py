@@ -0,0 +1,81 @@
+"""
+10_holdings_index.py
+Asset-to-clients and client-to-assets lookups without scanning the holdings.
+
+The flattened holdings (exploded_holdings, or the streamed
+holdings_streaming.parquet) have to be filtered in full to answer "who holds
+asset X" or "what does client Y hold". utils/holdings.py keeps two copies
+sorted by client and by asset, with an offset index per key, in memory-mapped
+Arrow IPC: a lookup is a binary search plus a slice. The script builds the
+index, then compares --lookups random point lookups with filter-based ones.
+
+Usage:
+    python 02_intermediate/10_holdings_index.py
+    python 02_intermediate/10_holdings_index.py --source datasets/exploded_holdings.csv --lookups 1000
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import polars as pl
+
+# Locate datasets directory
+datasets_dir = os.path.abspath(os.path.join(__file__, '..', '..', 'datasets'))
+
+# Shared helpers live in utils/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..')))
+from utils.holdings import HoldingsIndex, build_holdings_index
+from utils.ids import encode_ids
+
+
+def read_holdings(path):
+    """Flattened holdings with integer client and asset keys"""
+    df = pl.read_csv(path) if path.endswith(".csv") else pl.read_parquet(path)
+    return encode_ids(df.rename({"holdings": "asset_id"}), ["client_id", "asset_id"])
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sorted, offset-indexed holdings store")
+    parser.add_argument("--source", default=f"{datasets_dir}/holdings_streaming.parquet",
+                        help="flattened holdings (Parquet or CSV)")
+    parser.add_argument("--index-dir", default=f"{datasets_dir}/holdings_index")
+    parser.add_argument("--lookups", type=int, default=100_000)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    holdings = read_holdings(args.source)
+    print(f"Holdings: {holdings.height:,} rows, {holdings['client_id'].n_unique():,} clients, "
+          f"{holdings['asset_id'].n_unique():,} assets")
+
+    start = time.perf_counter()
+    build_holdings_index(holdings, args.index_dir)
+    print(f"Index built in {time.perf_counter() - start:.2f}s -> {args.index_dir}")
+
+    index = HoldingsIndex(args.index_dir)
+    rng = np.random.default_rng(42)
+    clients = rng.choice(holdings["client_id"].to_numpy(), args.lookups)
+    assets = rng.choice(holdings["asset_id"].to_numpy(), args.lookups)
+
+    start = time.perf_counter()
+    for client_id, asset_id in zip(clients, assets):
+        index.holdings_of_client(client_id)
+        index.holders_of_asset(asset_id)
+    elapsed = time.perf_counter() - start
+    print(f"\nIndexed lookups: {2 * args.lookups / elapsed:,.0f} lookups/s")
+
+    n_filter = min(args.lookups, 100)
+    start = time.perf_counter()
+    for client_id, asset_id in zip(clients[:n_filter], assets[:n_filter]):
+        holdings.filter(pl.col("client_id") == client_id)
+        holdings.filter(pl.col("asset_id") == asset_id)
+    elapsed = time.perf_counter() - start
+    print(f"Filter lookups:  {2 * n_filter / elapsed:,.0f} lookups/s")
+
+    # Same rows as a filter, in the original order within each key
+    client_id = int(clients[0])
+    assert index.holdings_of_client(client_id).equals(holdings.filter(pl.col("client_id") == client_id))
+    print(f"\nHoldings of client {client_id}:")
+    print(index.holdings_of_client(client_id))
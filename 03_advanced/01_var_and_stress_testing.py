@@ -1,4 +1,5 @@
 import os
+import sys
 import polars as pl
 import numpy as np
 import matplotlib.pyplot as plt
@@ -6,11 +7,14 @@ import matplotlib.pyplot as plt
 # Locate datasets directory
 datasets_dir = os.path.abspath(os.path.join(__file__, '..', '..', 'datasets'))
 
+# Shared helpers live in utils/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..')))
+from utils.loader import load_dataset
+from utils.risk_attribution import historical_attribution
+from utils.storage import write_dataset
+
 # Load benchmark returns for our analysis
-benchmarks = pl.read_csv(f"{datasets_dir}/benchmarks.csv")
-benchmarks = benchmarks.with_columns([
-    pl.col("date").str.strptime(pl.Datetime, format="%Y-%m-%dT%H:%M:%S%.f").alias("date")
-])
+benchmarks = load_dataset(datasets_dir, "benchmarks")
 
 # 1. PORTFOLIO CONSTRUCTION WITH MULTIPLE ASSETS
 # ==============================================
@@ -62,28 +66,28 @@ var_99 = portfolio_returns.select([
 print(f"1-day Value at Risk (99% confidence): ${-var_99:.2f}")
 
 # Group by asset type for VaR attribution
-returns = pl.concat([
-    portfolio_returns.with_columns([
-        pl.lit("asset1").alias("asset_type"),
-        pl.col("asset1_return").alias("return")
-    ]),
-    portfolio_returns.with_columns([
-        pl.lit("asset2").alias("asset_type"),
-        pl.col("asset2_return").alias("return")
-    ]),
-    portfolio_returns.with_columns([
-        pl.lit("asset3").alias("asset_type"),
-        pl.col("asset3_return").alias("return")
-    ])
-], how="vertical")
-
-var_by_type = returns.group_by("asset_type").agg([
+# unpivot turns the wide asset columns into one long (date, asset, return) panel
+# in a single pass, instead of concatenating a full copy per asset
+returns = portfolio_returns.unpivot(
+    index="date",
+    on=["asset1_return", "asset2_return", "asset3_return"],
+    variable_name="asset",
+    value_name="return",
+).with_columns(pl.col("asset").str.replace("_return", ""))
+
+var_by_type = returns.group_by("asset").agg([
     pl.col("return").std().alias("std_return"),
     pl.col("return").mean().alias("mean_return")
-])
+]).rename({"asset": "asset_type"})
 print("VaR by Asset Type:")
 print(var_by_type)
 
+# Component, marginal and incremental VaR/ES of each position
+weights_df = pl.DataFrame({"asset": ["asset1", "asset2", "asset3"], "weight": weights})
+attribution, totals = historical_attribution(returns, weights_df, confidence=0.95, value=portfolio_value)
+print(f"\nVaR/ES attribution (95%, VaR ${totals['VaR']:.2f}, ES ${totals['ES']:.2f}):")
+print(attribution)
+
 
 # 3. STRESS TESTING
 # ================
@@ -107,5 +111,5 @@ print("\nStress Test Results:")
 print(stress_df)
 
 # Save results
-portfolio_returns.write_csv(f"{datasets_dir}/portfolio_returns.csv")
-stress_df.write_csv(f"{datasets_dir}/stress_test_results.csv")
\ No newline at end of file
+write_dataset(portfolio_returns, datasets_dir, "portfolio_returns")
+write_dataset(stress_df, datasets_dir, "stress_test_results")
\ No newline at end of file
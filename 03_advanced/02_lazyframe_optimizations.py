@@ -1,5 +1,6 @@
 
 import os
+import sys
 import polars as pl
 import time
 import matplotlib.pyplot as plt
@@ -7,10 +8,22 @@ import matplotlib.pyplot as plt
 # Locate datasets directory
 datasets_dir = os.path.abspath(os.path.join(__file__, '..', '..', 'datasets'))
 
+# Shared helpers live in utils/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..')))
+from utils.batch import QueryBatch
+from utils.ids import decode_ids, encode_ids
+from utils.profiling import profile_queries, write_chrome_trace
+from utils.query_cache import QueryCache
+from utils.storage import scan_dataset, write_dataset
+
 # Load our datasets lazily
-tx_lazy = pl.scan_csv(f"{datasets_dir}/transactions.csv")
-clients_lazy = pl.scan_csv(f"{datasets_dir}/clients.csv")
-assets_lazy = pl.scan_parquet(f"{datasets_dir}/assets.parquet")
+# IDs are encoded to integer keys as part of each scan, so every join and
+# group_by below works on integers; decode_ids restores the strings for display
+# with the ID widths encode_ids recorded
+widths = {}
+tx_lazy = encode_ids(scan_dataset(datasets_dir, "transactions"), widths=widths)
+clients_lazy = encode_ids(scan_dataset(datasets_dir, "clients"), widths=widths)
+assets_lazy = encode_ids(scan_dataset(datasets_dir, "assets"), widths=widths)
 
 # 1. PREDICATE PUSHDOWN
 # =====================
@@ -23,7 +36,7 @@ result1 = (
     .filter(pl.col("amount") > 5000)
     .select(["transaction_id", "client_id", "asset_type"])
 )
-print(result1.collect().head())
+print(decode_ids(result1.collect().head(), widths))
 time1 = time.time() - start
 print(f"Time without explicit pushdown: {time1:.4f}s")
 
@@ -35,7 +48,7 @@ result2 = (
     .join(assets_lazy, on="asset_id")
     .select(["transaction_id", "client_id", "asset_type"])
 )
-print(result2.collect().head())
+print(decode_ids(result2.collect().head(), widths))
 time2 = time.time() - start
 print(f"Time with explicit pushdown: {time2:.4f}s")
 print(f"Speedup: {time1/time2:.2f}x")
@@ -51,7 +64,7 @@ result3 = (
     .join(assets_lazy, on="asset_id")
     .select(["transaction_id", "name", "asset_type"])
 )
-print(result3.collect().head())
+print(decode_ids(result3.collect().head(), widths))
 time3 = time.time() - start
 print(f"Time without explicit projection: {time3:.4f}s")
 
@@ -70,7 +83,7 @@ result4 = (
     )
     .select(["transaction_id", "name", "asset_type"])
 )
-print(result4.collect().head())
+print(decode_ids(result4.collect().head(), widths))
 time4 = time.time() - start
 print(f"Time with explicit projection: {time4:.4f}s")
 print(f"Speedup: {time3/time4:.2f}x")
@@ -113,4 +126,59 @@ complex_query = (
 )
 
 # Print the query optimization plan
-print(complex_query.explain())
\ No newline at end of file
+print(complex_query.explain())
+
+# 4b. RESULT CACHING
+# ==================
+# A QueryCache memoizes collect() on the optimized plan plus the state of the
+# input files, in memory and as IPC files under datasets/.cache/queries, so
+# running this script again answers these queries without rescanning.
+print("\nRESULT CACHING")
+query_cache = QueryCache(os.path.join(datasets_dir, ".cache", "queries"))
+for attempt in ("first", "second"):
+    start = time.time()
+    query_cache.collect(complex_query)
+    query_cache.collect(result5)
+    print(f"{attempt} run: {time.time() - start:.4f}s")
+print(query_cache.stats())
+
+# 4c. BATCHED EXECUTION
+# =====================
+# Each collect() above scans transactions.csv again. Collected together,
+# queries that share a subplan (the same scan, the same filtered frame) run
+# it once: result1/result2 and result3/result4 optimize to the same plans,
+# and result5/count5 share filtered_tx.
+print("\nBATCHED EXECUTION")
+batch = QueryBatch()
+for name, query in {"result1": result1, "result2": result2, "result3": result3,
+                    "result4": result4, "result5": result5, "count5": count5}.items():
+    batch.add(name, query)
+batched = batch.collect()
+print(f"Sum: {batched['result5'][0, 0]}, Count: {batched['count5'][0, 0]}")
+report = batch.compare()
+print(f"{report['queries']} queries: {report['sequential_scans']} scans sequentially, "
+      f"{report['batched_scans']} batched")
+print(f"Sequential: {report['sequential_s']:.4f}s, batched: {report['batched_s']:.4f}s, "
+      f"saved: {report['saved_s']:.4f}s ({report['speedup']:.2f}x)")
+
+# 5. PER-NODE PROFILING
+# =====================
+# Run with --profile to time every node of each plan above. The timings are
+# saved as a table and as a Chrome trace (open it in chrome://tracing or
+# https://ui.perfetto.dev) to see where each query spends its time.
+# On Polars 2.0, which dropped LazyFrame.profile(), each node is timed as its
+# own sub-plan (see utils/profiling.py); self_us is the time spent in the node.
+if "--profile" in sys.argv:
+    print("\nPER-NODE PROFILE")
+    timings = profile_queries({
+        "predicate_pushdown_after_join": result1,
+        "predicate_pushdown_before_join": result2,
+        "projection_pushdown_implicit": result3,
+        "projection_pushdown_explicit": result4,
+        "complex_query": complex_query,
+    })
+    with pl.Config(tbl_rows=-1, fmt_str_lengths=60):
+        print(timings)
+    write_dataset(timings, datasets_dir, "lazy_query_profile")
+    write_chrome_trace(timings, f"{datasets_dir}/lazy_query_profile.trace.json")
+    print(f"Chrome trace written to {datasets_dir}/lazy_query_profile.trace.json")
@@ -1,59 +1,61 @@
 import os
+import sys
 import polars as pl
 import pandas as pd
 import numpy as np
-import time
 import matplotlib.pyplot as plt
 
 # Locate datasets directory
 datasets_dir = os.path.abspath(os.path.join(__file__, '..', '..', 'datasets'))
 
-def benchmark(name, polars_fn, pandas_fn, repeat=5):
+# Shared helpers live in utils/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..')))
+from utils.bench import report, run_benchmark
+from utils.storage import read_dataset, read_dataset_pandas, write_dataset
+
+# Every run is appended to the history; --update-baseline makes it the new reference
+update_baseline = "--update-baseline" in sys.argv
+history_path = f"{datasets_dir}/benchmark_history.jsonl"
+baseline_path = f"{datasets_dir}/benchmark_baseline.json"
+runs = []
+
+def benchmark(name, polars_fn, pandas_fn, repeat=10, warmups=2):
     """Run benchmark comparing polars vs pandas performance"""
     
-    # Warm up
-    polars_fn()
-    pandas_fn()
-    
-    # Benchmark Polars
-    polars_times = []
-    for _ in range(repeat):
-        start = time.time()
-        polars_fn()
-        polars_times.append(time.time() - start)
-    
-    # Benchmark Pandas
-    pandas_times = []
-    for _ in range(repeat):
-        start = time.time()
-        pandas_fn()
-        pandas_times.append(time.time() - start)
+    # Warm-up runs are excluded; timings use perf_counter_ns with outlier rejection
+    polars_run = run_benchmark(f"{name} [polars]", polars_fn, repeat=repeat, warmups=warmups)
+    pandas_run = run_benchmark(f"{name} [pandas]", pandas_fn, repeat=repeat, warmups=warmups)
+    runs.extend([polars_run, pandas_run])
     
-    # Calculate average times
-    polars_avg = sum(polars_times) / repeat
-    pandas_avg = sum(pandas_times) / repeat
-    speedup = pandas_avg / polars_avg
+    # Medians are robust to the occasional slow run, unlike the mean
+    polars_stats = polars_run["stats"]
+    pandas_stats = pandas_run["stats"]
+    speedup = pandas_stats["median"] / polars_stats["median"]
     
     print(f"\n{name} Benchmark:")
-    print(f"Polars: {polars_avg:.4f}s")
-    print(f"Pandas: {pandas_avg:.4f}s")
+    print(f"Polars: median {polars_stats['median']:.4f}s, p95 {polars_stats['p95']:.4f}s, "
+          f"MAD {polars_stats['mad']:.4f}s")
+    print(f"Pandas: median {pandas_stats['median']:.4f}s, p95 {pandas_stats['p95']:.4f}s, "
+          f"MAD {pandas_stats['mad']:.4f}s")
     print(f"Speedup: {speedup:.2f}x")
     
     return {
         "name": name,
-        "polars_time": polars_avg,
-        "pandas_time": pandas_avg,
+        "polars_time": polars_stats["median"],
+        "pandas_time": pandas_stats["median"],
+        "polars_p95": polars_stats["p95"],
+        "pandas_p95": pandas_stats["p95"],
         "speedup": speedup
     }
 
 # BENCHMARK 1: DATA LOADING
 # ========================
 def polars_load():
-    df = pl.read_csv(f"{datasets_dir}/transactions.csv")
+    df = read_dataset(datasets_dir, "transactions")
     return df
 
 def pandas_load():
-    df = pd.read_csv(f"{datasets_dir}/transactions.csv")
+    df = read_dataset_pandas(datasets_dir, "transactions")
     return df
 
 load_result = benchmark("Data Loading", polars_load, pandas_load)
@@ -61,8 +63,8 @@ load_result = benchmark("Data Loading", polars_load, pandas_load)
 # BENCHMARK 2: FILTERING
 # =====================
 # Load data for filtering benchmark
-polars_df = pl.read_csv(f"{datasets_dir}/transactions.csv")
-pandas_df = pd.read_csv(f"{datasets_dir}/transactions.csv")
+polars_df = read_dataset(datasets_dir, "transactions")
+pandas_df = read_dataset_pandas(datasets_dir, "transactions")
 
 def polars_filter():
     return polars_df.filter(pl.col("amount") > 5000)
@@ -88,8 +90,8 @@ print(f"\nUnique groups: {group_res.shape[0]} clients")
 
 # BENCHMARK 4: JOIN OPERATION
 # ==========================
-clients_pl = pl.read_csv(f"{datasets_dir}/clients.csv")
-clients_pd = pd.read_csv(f"{datasets_dir}/clients.csv")
+clients_pl = read_dataset(datasets_dir, "clients")
+clients_pd = read_dataset_pandas(datasets_dir, "clients")
 
 def polars_join():
     return polars_df.join(clients_pl, on="client_id")
@@ -113,11 +115,14 @@ results_df = pl.DataFrame({
     "operation": names,
     "polars_time": polars_times,
     "pandas_time": pandas_times,
+    "polars_p95": [r["polars_p95"] for r in results],
+    "pandas_p95": [r["pandas_p95"] for r in results],
     "speedup": speedups
 })
 
-print("\nBenchmark Results Summary:")
+print("\nBenchmark Results Summary (median seconds):")
 print(results_df)
 
-# Save results
-results_df.write_csv(f"{datasets_dir}/benchmark_results.csv")
\ No newline at end of file
+# Save the latest summary, and append the raw runs to the history with a baseline check
+write_dataset(results_df, datasets_dir, "benchmark_results")
+report(runs, history_path, baseline_path, update_baseline=update_baseline)
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+04_id_encoding_benchmark.py
+Join and group-by throughput on string IDs vs integer surrogate keys.
+
+utils/ids.py maps "C0001"-style IDs to UInt32/UInt64 keys at ingest. This script
+builds a large synthetic transaction table, then times the same join and
+group_by operations on the original string IDs and on the encoded keys.
+
+Usage:
+    python 03_advanced/04_id_encoding_benchmark.py --rows 10000000
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import polars as pl
+
+# Shared helpers live in utils/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..')))
+from utils.ids import decode_ids, encode_ids, format_ids, id_width
+
+
+def time_it(fn, repeat):
+    """Median wall time of fn over repeat runs, after one warm-up"""
+    fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def build_frames(rows, n_clients, n_assets, seed=42):
+    rng = np.random.default_rng(seed)
+    tx = pl.DataFrame({
+        "transaction_id": format_ids("T", np.arange(rows), id_width(rows, 6)),
+        "client_id": format_ids("C", rng.integers(0, n_clients, rows), id_width(n_clients, 4)),
+        "asset_id": format_ids("A", rng.integers(0, n_assets, rows), id_width(n_assets, 4)),
+        "amount": np.round(rng.normal(10000, 5000, rows), 2),
+    })
+    clients = pl.DataFrame({
+        "client_id": format_ids("C", np.arange(n_clients), id_width(n_clients, 4)),
+        "name": format_ids("Client ", np.arange(n_clients), 0),
+    })
+    return tx, clients
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="String ID vs integer key benchmark")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--assets", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    tx_str, clients_str = build_frames(args.rows, args.clients, args.assets)
+    print(f"Transactions: {tx_str.height:,} rows, {args.clients:,} clients, {args.assets:,} assets")
+
+    # Encoding is a one-off ingest cost, reported separately
+    encode_time = time_it(lambda: encode_ids(tx_str), args.repeat)
+    widths = {}
+    tx_int = encode_ids(tx_str, widths=widths)
+    clients_int = encode_ids(clients_str, widths=widths)
+    print(f"Encoding IDs: {encode_time:.3f}s ({tx_str.height / encode_time / 1e6:.1f}M rows/s)")
+
+    assert decode_ids(clients_int, widths).equals(clients_str)
+    assert decode_ids(tx_int.select(["transaction_id", "client_id"]), widths).equals(
+        tx_str.select(["transaction_id", "client_id"])
+    )
+
+    operations = {
+        "join on client_id": lambda tx, clients: tx.join(clients, on="client_id"),
+        "group_by client_id": lambda tx, clients: tx.group_by("client_id").agg(pl.sum("amount")),
+        "group_by client_id, asset_id": lambda tx, clients: (
+            tx.group_by(["client_id", "asset_id"]).agg(pl.sum("amount"), pl.len())
+        ),
+    }
+
+    results = []
+    for name, op in operations.items():
+        string_time = time_it(lambda: op(tx_str, clients_str), args.repeat)
+        int_time = time_it(lambda: op(tx_int, clients_int), args.repeat)
+        results.append({
+            "operation": name,
+            "string_ids_s": string_time,
+            "integer_keys_s": int_time,
+            "string_mrows_per_s": tx_str.height / string_time / 1e6,
+            "integer_mrows_per_s": tx_str.height / int_time / 1e6,
+            "speedup": string_time / int_time,
+        })
+
+    results_df = pl.DataFrame(results)
+    print("\nString IDs vs integer keys:")
+    print(results_df)
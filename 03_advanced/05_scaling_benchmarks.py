@@ -0,0 +1,191 @@
+"""
+05_scaling_benchmarks.py
+Throughput of core operations across data sizes and thread counts.
+
+On the 1,000-row tutorial data fixed overhead dominates every timing. This suite
+measures load, filter, group_by, join, rolling and asof-join throughput (rows/s)
+on synthetic transactions from 1e3 up to 1e8 rows, once per POLARS_MAX_THREADS
+value (1, 2, 4, ... up to the core count). Polars reads POLARS_MAX_THREADS only
+at import time, so each thread count runs in its own worker process.
+
+The summary reports, per operation, the thread count beyond which doubling the
+threads no longer gives a worthwhile speedup at the largest size.
+
+Usage:
+    python 03_advanced/05_scaling_benchmarks.py                    # 1e3 .. 1e8 rows
+    python 03_advanced/05_scaling_benchmarks.py --max-rows 1e7 --threads 1 2 4
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+
+# Locate datasets directory
+datasets_dir = os.path.abspath(os.path.join(__file__, '..', '..', 'datasets'))
+
+# Shared helpers live in utils/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..')))
+
+OPERATIONS = ["load", "filter", "group_by", "join", "rolling", "asof"]
+N_CLIENTS = 10_000
+# A doubling of threads that gains less than this is treated as "no longer scaling"
+MIN_DOUBLING_GAIN = 1.2
+
+
+def data_path(work_dir, rows):
+    return os.path.join(work_dir, f"transactions_{rows}.parquet")
+
+
+def write_data(work_dir, rows, seed=42):
+    """Synthetic transactions with integer client keys, sorted by date"""
+    import polars as pl
+
+    rng = np.random.default_rng(seed)
+    pl.DataFrame({
+        "client_id": rng.integers(0, N_CLIENTS, rows).astype(np.uint32),
+        "amount": np.round(rng.normal(10000, 5000, rows), 2),
+        "date": np.datetime64("2020-01-01", "ms") + np.arange(rows) * np.timedelta64(60_000, "ms"),
+    }).write_parquet(data_path(work_dir, rows))
+
+
+def operations(df, clients, benchmark):
+    """The timed operations, each a zero-argument callable"""
+    import polars as pl
+
+    return {
+        "filter": lambda: df.filter(pl.col("amount") > 10000),
+        "group_by": lambda: df.group_by("client_id").agg(pl.sum("amount"), pl.len()),
+        "join": lambda: df.join(clients, on="client_id"),
+        "rolling": lambda: df.select(
+            pl.col("amount").rolling_mean(window_size=24).over("client_id")
+        ),
+        "asof": lambda: df.join_asof(benchmark, on="date"),
+    }
+
+
+def run_worker(work_dir, sizes, threads):
+    """Time every operation at every size with the current thread pool"""
+    import polars as pl
+    from utils.bench import measure, summarize
+
+    results = []
+    for rows in sizes:
+        path = data_path(work_dir, rows)
+        repeat = 10 if rows <= 1_000_000 else 3
+        df = pl.read_parquet(path)
+        clients = pl.DataFrame({
+            "client_id": np.arange(N_CLIENTS, dtype=np.uint32),
+            "segment": np.arange(N_CLIENTS) % 5,
+        })
+        benchmark = (
+            df.select(pl.col("date").dt.truncate("1d")).unique().sort("date")
+              .with_columns(pl.lit(0.0005).alias("benchmark_return"))
+        )
+        ops = {"load": lambda: pl.read_parquet(path), **operations(df, clients, benchmark)}
+        for name in OPERATIONS:
+            stats = summarize(measure(ops[name], repeat=repeat, warmups=1))
+            results.append({
+                "operation": name,
+                "rows": rows,
+                "threads": threads,
+                "median_s": stats["median"],
+                "p95_s": stats["p95"],
+                "rows_per_s": rows / stats["median"],
+            })
+        del df
+    return results
+
+
+def thread_counts(max_threads):
+    counts, t = [], 1
+    while t < max_threads:
+        counts.append(t)
+        t *= 2
+    return counts + [max_threads]
+
+
+def scaling_limits(results):
+    """Per operation, the thread count after which doubling threads stops paying off"""
+    import polars as pl
+
+    largest = results.filter(pl.col("rows") == pl.col("rows").max())
+    limits = []
+    for (op,), group in largest.sort("threads").group_by(["operation"], maintain_order=True):
+        threads = group["threads"].to_list()
+        throughput = group["rows_per_s"].to_list()
+        limit = threads[-1]
+        for i in range(1, len(threads)):
+            if throughput[i] / throughput[i - 1] < MIN_DOUBLING_GAIN:
+                limit = threads[i - 1]
+                break
+        limits.append({
+            "operation": op,
+            "rows": group["rows"][0],
+            "scales_up_to_threads": limit,
+            "speedup_at_max_threads": throughput[-1] / throughput[0],
+        })
+    return pl.DataFrame(limits)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Data-size and thread-count scaling benchmarks")
+    parser.add_argument("--min-rows", type=float, default=1e3)
+    parser.add_argument("--max-rows", type=float, default=1e8)
+    parser.add_argument("--threads", type=int, nargs="*", default=None,
+                        help="thread counts (default: 1, 2, 4, ... up to the core count)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--work-dir", default=None, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sizes = [
+        int(10 ** e) for e in range(int(np.log10(args.min_rows)), int(np.log10(args.max_rows)) + 1)
+    ]
+
+    if args.worker:
+        threads = int(os.environ["POLARS_MAX_THREADS"])
+        print(json.dumps(run_worker(args.work_dir, sizes, threads)))
+        sys.exit(0)
+
+    import polars as pl
+    from utils.storage import write_dataset
+
+    work_dir = tempfile.mkdtemp(prefix="polars_scaling_")
+    try:
+        for rows in sizes:
+            write_data(work_dir, rows)
+
+        results = []
+        for threads in args.threads or thread_counts(os.cpu_count()):
+            print(f"Running with POLARS_MAX_THREADS={threads} ...")
+            proc = subprocess.run(
+                [sys.executable, __file__, "--worker", "--work-dir", work_dir,
+                 "--min-rows", str(args.min_rows), "--max-rows", str(args.max_rows)],
+                env={**os.environ, "POLARS_MAX_THREADS": str(threads)},
+                capture_output=True, text=True, check=True,
+            )
+            results.extend(json.loads(proc.stdout.strip().splitlines()[-1]))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results_df = pl.DataFrame(results)
+
+    with pl.Config(tbl_rows=-1, tbl_cols=-1):
+        print("\nThroughput (million rows/s) by operation, size and thread count:")
+        print(
+            results_df
+            .with_columns((pl.col("rows_per_s") / 1e6).round(2).alias("mrows_per_s"))
+            .pivot(on="threads", index=["operation", "rows"], values="mrows_per_s")
+            .sort(["operation", "rows"])
+        )
+        print(f"\nThread scaling at {results_df['rows'].max():,} rows "
+              f"(stops when doubling threads gains < {MIN_DOUBLING_GAIN}x):")
+        print(scaling_limits(results_df))
+
+    write_dataset(results_df, datasets_dir, "scaling_results")
@@ -0,0 +1,59 @@
+"""
+10_query_service.py
+Serve the top-clients, client-totals and attribution queries over HTTP.
+
+The batch scripts answer these questions by rescanning the CSVs and writing a
+file each time. This service (utils/service.py) loads the typed datasets once,
+keeps them in memory and answers each request with one Polars query on a
+bounded thread pool, coalescing identical requests that are already running.
+Results are returned as JSON or, with format=arrow, as an Arrow IPC stream.
+
+Usage:
+    python 03_advanced/10_query_service.py --port 8050 --workers 4
+    curl "http://127.0.0.1:8050/query/top_clients?n=5"
+    curl "http://127.0.0.1:8050/query/attribution?by=region&year=2020&month=1"
+
+Load-test it with 03_advanced/11_query_load_test.py.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+# Locate datasets directory
+datasets_dir = os.path.abspath(os.path.join(__file__, '..', '..', 'datasets'))
+
+# Shared helpers live in utils/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..')))
+from utils.service import QueryService, load_frames
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Local analytics query service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050, help="0 picks a free port")
+    parser.add_argument("--workers", type=int, default=4, help="query threads")
+    return parser.parse_args()
+
+
+async def main(args):
+    start = time.perf_counter()
+    frames = load_frames(datasets_dir)
+    print(f"Loaded {', '.join(f'{name} ({df.height:,} rows)' for name, df in frames.items())} "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    service = QueryService(frames, max_workers=args.workers)
+    server = await service.serve(args.host, args.port)
+    host, port = server.sockets[0].getsockname()[:2]
+    # The load test reads this line to find the port
+    print(f"Listening on http://{host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,158 @@
+"""
+11_query_load_test.py
+p50/p99 latency of the query service at increasing concurrency.
+
+For each concurrency level, that many clients each keep one HTTP/1.1
+connection open and send requests from a fixed mix of top_clients,
+client_totals and attribution queries until --requests have completed. The
+script reports p50/p99 latency, throughput, and how many requests the service
+executed vs coalesced into a query already running (from /stats).
+
+Without --url, the service (10_query_service.py) is started on a free port for
+the duration of the test.
+
+Usage:
+    python 03_advanced/11_query_load_test.py
+    python 03_advanced/11_query_load_test.py --url http://127.0.0.1:8050 --concurrency 1 8 64 --format arrow
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+from urllib.parse import urlsplit
+import numpy as np
+import polars as pl
+
+# Locate datasets directory
+datasets_dir = os.path.abspath(os.path.join(__file__, '..', '..', 'datasets'))
+
+# Shared helpers live in utils/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..')))
+from utils.storage import write_dataset
+
+SERVICE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "10_query_service.py")
+
+REQUEST_MIX = [
+    "/query/top_clients?n=5",
+    "/query/top_clients?n=10&min_amount=2000",
+    "/query/client_totals?n=20",
+    "/query/attribution?by=asset_type",
+    "/query/attribution?by=region",
+    "/query/attribution?by=region&year=2020&month=1",
+]
+
+
+async def fetch(reader, writer, path):
+    """GET path on an open keep-alive connection; returns (status, body)"""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        field, _, value = line.decode("latin-1").partition(":")
+        if field.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def get_json(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, body = await fetch(reader, writer, path)
+    finally:
+        writer.close()
+    return json.loads(body)
+
+
+async def run_level(host, port, concurrency, n_requests, fmt):
+    """Latencies (seconds) of n_requests sent by `concurrency` clients"""
+    paths = [f"{REQUEST_MIX[i % len(REQUEST_MIX)]}&format={fmt}" for i in range(n_requests)]
+    queue = iter(paths)
+    latencies = []
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for path in queue:
+                start = time.perf_counter()
+                status, body = await fetch(reader, writer, path)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    raise RuntimeError(f"{path}: HTTP {status} {body[:200]!r}")
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies
+
+
+async def load_test(host, port, levels, n_requests, fmt):
+    rows = []
+    for concurrency in levels:
+        before = await get_json(host, port, "/stats")
+        start = time.perf_counter()
+        latencies = await run_level(host, port, concurrency, n_requests, fmt)
+        elapsed = time.perf_counter() - start
+        after = await get_json(host, port, "/stats")
+        rows.append({
+            "concurrency": concurrency,
+            "requests": len(latencies),
+            "p50_ms": float(np.percentile(latencies, 50)) * 1000,
+            "p99_ms": float(np.percentile(latencies, 99)) * 1000,
+            "requests_per_s": len(latencies) / elapsed,
+            "executions": after["executions"] - before["executions"],
+            "coalesced": after["coalesced"] - before["coalesced"],
+        })
+        print(f"concurrency {concurrency:>3}: p50 {rows[-1]['p50_ms']:7.2f} ms, "
+              f"p99 {rows[-1]['p99_ms']:7.2f} ms, {rows[-1]['requests_per_s']:8,.0f} req/s, "
+              f"{rows[-1]['coalesced']} coalesced")
+    return pl.DataFrame(rows)
+
+
+def start_service(workers):
+    """Run 10_query_service.py on a free port; returns (process, host, port)"""
+    proc = subprocess.Popen(
+        [sys.executable, SERVICE_SCRIPT, "--port", "0", "--workers", str(workers)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    for line in proc.stdout:
+        print(f"[service] {line.rstrip()}")
+        if line.startswith("Listening on "):
+            url = urlsplit(line.split()[-1])
+            return proc, url.hostname, url.port
+    raise RuntimeError(f"Query service exited with code {proc.wait()}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Query service load test")
+    parser.add_argument("--url", default=None, help="running service (default: start one)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--requests", type=int, default=600, help="requests per concurrency level")
+    parser.add_argument("--format", choices=["json", "arrow"], default="json")
+    parser.add_argument("--workers", type=int, default=4, help="query threads of a started service")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    proc = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port
+    else:
+        proc, host, port = start_service(args.workers)
+    try:
+        results = asyncio.run(load_test(host, port, args.concurrency, args.requests, args.format))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    print(results)
+    write_dataset(results, datasets_dir, "query_service_latency")
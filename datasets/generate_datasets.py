@@ -1,52 +1,209 @@
 # datasets/generate_datasets.py
+#
+# Usage:
+#   python datasets/generate_datasets.py                 # small tutorial datasets
+#   python datasets/generate_datasets.py --scale 10      # 10M transactions, chunked
+#   python datasets/generate_datasets.py --scale 1000 --workers 8 --chunk-rows 2000000
+#   python datasets/generate_datasets.py --format parquet  # or set LEARN_POLARS_FORMAT
 
 import os
+import sys
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import polars as pl
 import pandas as pd
 import numpy as np
 
 BASE_DIR = os.path.dirname(__file__)
+sys.path.insert(0, os.path.abspath(os.path.join(BASE_DIR, '..')))
 
-def generate_transactions(n=1000):
-    client_ids = [f"C{i:04d}" for i in range(100)]
-    asset_ids = [f"A{i:04d}" for i in range(50)]
+from utils.ids import format_ids, id_width
+from utils.storage import EXTENSIONS, SORTED_BY, data_format, is_hive, write_dataset, write_frame, write_hive
+
+# Rows per unit of scale factor (TPC-style: --scale 1 -> 1M transactions)
+SCALE_ROWS = {
+    "transactions": 1_000_000,
+    "clients": 10_000,
+    "assets": 1_000,
+}
+ASSET_TYPES = ["Equity", "Bond", "Commodity"]
+REGIONS = ["US", "EU", "APAC"]
+HISTORY_START = np.datetime64("2020-01-01T00:00:00", "us")
+
+
+def generate_transactions(n=1000, fmt=None):
+    client_ids = format_ids("C", np.arange(100), 4).to_numpy()
+    asset_ids = format_ids("A", np.arange(50), 4).to_numpy()
     df = pl.DataFrame({
-        "transaction_id": [f"T{i:06d}" for i in range(n)],
+        "transaction_id": format_ids("T", np.arange(n), 6),
         "client_id": np.random.choice(client_ids, size=n),
         "asset_id": np.random.choice(asset_ids, size=n),
         "amount": np.round(np.random.normal(10000, 5000, size=n),2),
         "date": pd.date_range("2020-01-01", periods=n, freq="h")
     })
-    df.write_csv(os.path.join(BASE_DIR, "transactions.csv"))
+    write_dataset(df, BASE_DIR, "transactions", fmt)
 
-def generate_clients(n=100):
+def generate_clients(n=100, fmt=None):
     df = pl.DataFrame({
-        "client_id": [f"C{i:04d}" for i in range(n)],
-        "name": [f"Client {i}" for i in range(n)],
+        "client_id": format_ids("C", np.arange(n), 4),
+        "name": format_ids("Client ", np.arange(n), 0),
         "join_date": pd.date_range("2018-01-01", periods=n, freq="D")
     })
-    df.write_csv(os.path.join(BASE_DIR, "clients.csv"))
+    write_dataset(df, BASE_DIR, "clients", fmt)
 
-def generate_assets(n=50):
+def generate_assets(n=50, fmt=None):
     df = pl.DataFrame({
-        "asset_id": [f"A{i:04d}" for i in range(n)],
-        "asset_type": np.random.choice(["Equity","Bond","Commodity"], size=n),
-        "region": np.random.choice(["US","EU","APAC"], size=n),
+        "asset_id": format_ids("A", np.arange(n), 4),
+        "asset_type": np.random.choice(ASSET_TYPES, size=n),
+        "region": np.random.choice(REGIONS, size=n),
         "price": np.round(np.random.normal(100, 20, size=n),2)
     })
-    df.write_parquet(os.path.join(BASE_DIR, "assets.parquet"))
+    write_dataset(df, BASE_DIR, "assets", fmt)
 
-def generate_benchmarks(n=365):
+def generate_benchmarks(n=365, fmt=None):
     dates = pd.date_range("2020-01-01", periods=n, freq="D")
     df = pl.DataFrame({
         "date": dates,
         "benchmark_return": np.round(np.random.normal(0.0005, 0.002, size=n),6)
     })
-    df.write_csv(os.path.join(BASE_DIR, "benchmarks.csv"))
+    write_dataset(df, BASE_DIR, "benchmarks", fmt)
+
+
+# SCALE-FACTOR MODE
+# =================
+# Every table is split into fixed-size partitions. Each partition is built by a
+# worker process from its own seed (base seed, table, partition index), so the
+# output is identical regardless of worker count or scheduling order, and no
+# process ever holds more than one chunk in memory.
+
+TABLE_SEEDS = {"transactions": 0, "clients": 1, "assets": 2}
+
+
+def partition_rng(seed, table, part):
+    """Deterministic generator for one partition of one table"""
+    return np.random.default_rng([seed, TABLE_SEEDS[table], part])
+
+
+def build_transactions_chunk(rng, start, stop, sizes, step_us):
+    n = stop - start
+    keys = np.arange(start, stop, dtype=np.int64)
+    return pl.DataFrame({
+        "transaction_id": format_ids("T", keys, id_width(sizes["transactions"], 6)),
+        "client_id": format_ids(
+            "C", rng.integers(0, sizes["clients"], size=n), id_width(sizes["clients"], 4)
+        ),
+        "asset_id": format_ids(
+            "A", rng.integers(0, sizes["assets"], size=n), id_width(sizes["assets"], 4)
+        ),
+        "amount": np.round(rng.normal(10000, 5000, size=n), 2),
+        # Strictly increasing dates, evenly spaced over the configured history
+        "date": HISTORY_START + keys * np.timedelta64(step_us, "us"),
+    })
+
+
+def build_clients_chunk(rng, start, stop, sizes, step_us):
+    keys = np.arange(start, stop, dtype=np.int64)
+    return pl.DataFrame({
+        "client_id": format_ids("C", keys, id_width(sizes["clients"], 4)),
+        "name": format_ids("Client ", keys, 0),
+        "join_date": np.datetime64("2018-01-01", "us")
+        + rng.integers(0, 2 * 365, size=len(keys)) * np.timedelta64(86_400_000_000, "us"),
+    })
+
+
+def build_assets_chunk(rng, start, stop, sizes, step_us):
+    n = stop - start
+    return pl.DataFrame({
+        "asset_id": format_ids("A", np.arange(start, stop), id_width(sizes["assets"], 4)),
+        "asset_type": rng.choice(ASSET_TYPES, size=n),
+        "region": rng.choice(REGIONS, size=n),
+        "price": np.round(rng.normal(100, 20, size=n), 2),
+    })
+
+
+CHUNK_BUILDERS = {
+    "transactions": build_transactions_chunk,
+    "clients": build_clients_chunk,
+    "assets": build_assets_chunk,
+}
+
+
+def write_partition(task):
+    """Worker entry point: build one chunk and write it straight to disk"""
+    table, part, start, stop, sizes, step_us, seed, out_dir, fmt = task
+    rng = partition_rng(seed, table, part)
+    df = CHUNK_BUILDERS[table](rng, start, stop, sizes, step_us)
+    if is_hive(table, fmt):
+        # Each chunk may span a month boundary; every worker writes its own part file
+        write_hive(df, os.path.join(out_dir, table), fmt, part=part, sorted_by=SORTED_BY.get(table))
+    else:
+        write_frame(df, os.path.join(out_dir, table, f"part-{part:05d}.{EXTENSIONS[fmt]}"), fmt,
+                    SORTED_BY.get(table))
+    return table, df.height
+
+
+def scale_sizes(scale):
+    return {table: max(1, int(rows * scale)) for table, rows in SCALE_ROWS.items()}
+
+
+def generate_scaled(scale, out_dir, chunk_rows=1_000_000, workers=None, seed=42, years=10, fmt=None):
+    # Chunked output defaults to Parquet: CSV parsing dominates at this size
+    fmt = data_format(None, fmt or os.environ.get("LEARN_POLARS_FORMAT") or "parquet")
+    sizes = scale_sizes(scale)
+    history_us = years * 365 * 86_400_000_000
+    step_us = max(1, history_us // sizes["transactions"])
+
+    tasks = []
+    for table, n in sizes.items():
+        os.makedirs(os.path.join(out_dir, table), exist_ok=True)
+        for part, start in enumerate(range(0, n, chunk_rows)):
+            stop = min(start + chunk_rows, n)
+            tasks.append((table, part, start, stop, sizes, step_us, seed, out_dir, fmt))
+
+    written = dict.fromkeys(sizes, 0)
+    # Spawned, not forked: forking a process whose Polars thread pool is already
+    # running (a caller that loaded data first) can deadlock the workers
+    spawn = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=spawn) as pool:
+        for table, rows in pool.map(write_partition, tasks):
+            written[table] += rows
+    return written
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate tutorial datasets")
+    parser.add_argument("--scale", type=float, default=None,
+                        help="scale factor; 1 = 1M transactions, 10k clients, 1k assets")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000,
+                        help="rows per partition file (bounds per-worker memory)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--years", type=int, default=10,
+                        help="length of the transaction date history")
+    parser.add_argument("--format", choices=["csv", "parquet", "ipc"], default=None,
+                        help="storage format (default: $LEARN_POLARS_FORMAT, else original formats)")
+    parser.add_argument("--out", default=None,
+                        help="output directory (default: datasets/scale_sf<scale>)")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    generate_transactions()
-    generate_clients()
-    generate_assets()
-    generate_benchmarks()
-    print("Dummy datasets generated in 'datasets/' folder.")
+    args = parse_args()
+    if args.scale is None:
+        generate_transactions(fmt=args.format)
+        generate_clients(fmt=args.format)
+        generate_assets(fmt=args.format)
+        generate_benchmarks(fmt=args.format)
+        print("Dummy datasets generated in 'datasets/' folder.")
+    else:
+        out_dir = args.out or os.path.join(BASE_DIR, f"scale_sf{args.scale:g}")
+        written = generate_scaled(
+            args.scale, out_dir,
+            chunk_rows=args.chunk_rows, workers=args.workers,
+            seed=args.seed, years=args.years, fmt=args.format,
+        )
+        for table, rows in written.items():
+            print(f"{table}: {rows:,} rows")
+        print(f"Scale factor {args.scale:g} datasets generated in '{out_dir}'.")
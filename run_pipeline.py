@@ -0,0 +1,347 @@
+"""
+run_pipeline.py
+Incremental, parallel runner for the tutorial scripts.
+
+Each stage declares the datasets it reads and writes, which makes the scripts
+a DAG (for example cleaned_transactions feeds the joining, portfolio and
+attribution stages). A stage is skipped when the hashes of its code, its inputs
+and its outputs all match the previous successful run, recorded in
+datasets/.pipeline_state.json. Stages whose dependencies are satisfied run at
+the same time, each in its own Python process.
+
+Stages marked "benchmark" only time things; they produce no data other stages
+read and they append to the benchmark history and baseline. They are left out
+unless --benchmarks is given or they are named explicitly, so a routine run
+stays fast and never moves the baseline as a side effect.
+
+Usage:
+    python run_pipeline.py               # run what changed
+    python run_pipeline.py --force       # rerun everything
+    python run_pipeline.py --dry-run     # show what would run
+    python run_pipeline.py --benchmarks  # also run the benchmark stages
+    python run_pipeline.py --jobs 4 01_data_cleaning   # a stage and everything upstream
+"""
+import os
+import sys
+import json
+import glob
+import time
+import hashlib
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+datasets_dir = os.path.join(BASE_DIR, "datasets")
+sys.path.insert(0, BASE_DIR)
+
+from utils.loader import source_hash
+from utils.storage import dataset_path
+
+STATE_FILE = os.path.join(datasets_dir, ".pipeline_state.json")
+
+# Shared code every stage depends on; editing it invalidates all stages
+SHARED_CODE = sorted(glob.glob(os.path.join(BASE_DIR, "utils", "*.py")))
+
+# Inputs/outputs are dataset names (resolved in the configured storage format)
+# or, when they contain a dot, literal file names inside datasets/;
+# "benchmark": True stages run only on request (see the module docstring);
+# "args" are passed to the script, e.g. small sizes for a demo that defaults to a large run
+STAGES = {
+    "generate_datasets": {
+        "script": "datasets/generate_datasets.py",
+        "inputs": [],
+        "outputs": ["transactions", "clients", "assets", "benchmarks"],
+    },
+    "01_data_cleaning": {
+        "script": "01_basics/01_data_cleaning.py",
+        "inputs": ["transactions"],
+        "outputs": ["cleaned_transactions"],
+    },
+    "02_joining_and_filtering": {
+        "script": "01_basics/02_joining_and_filtering.py",
+        "inputs": ["cleaned_transactions", "clients", "assets"],
+        "outputs": ["joined_transactions"],
+    },
+    "03_lazy_vs_eager": {
+        "script": "01_basics/03_lazy_vs_eager.py",
+        "inputs": ["transactions"],
+        "outputs": [],
+        "benchmark": True,
+    },
+    "04_streaming_data_cleaning": {
+        "script": "01_basics/04_streaming_data_cleaning.py",
+        "inputs": ["transactions"],
+        "outputs": ["cleaned_transactions_streaming.parquet"],
+    },
+    "01_time_series_and_rolling": {
+        "script": "02_intermediate/01_time_series_and_rolling.py",
+        "inputs": ["benchmarks"],
+        "outputs": ["rolling_benchmarks"],
+    },
+    "02_portfolio_performance": {
+        "script": "02_intermediate/02_portfolio_performance.py",
+        "inputs": ["cleaned_transactions", "assets"],
+        "outputs": ["portfolio_performance"],
+    },
+    "03_return_attribution": {
+        "script": "02_intermediate/03_return_attribution.py",
+        "inputs": ["cleaned_transactions", "assets", "benchmarks"],
+        "outputs": ["asset_type_attribution", "region_attribution"],
+    },
+    "04_nested_data_and_explode": {
+        "script": "02_intermediate/04_nested_data_and_explode.py",
+        "inputs": [],
+        "outputs": ["nested.json", "exploded_holdings", "melted_assets"],
+    },
+    "05_panel_rolling": {
+        "script": "02_intermediate/05_panel_rolling.py",
+        "args": ["--series", "200", "--days", "250"],
+        "inputs": [],
+        "outputs": [],
+    },
+    "06_client_performance": {
+        "script": "02_intermediate/06_client_performance.py",
+        "inputs": ["cleaned_transactions", "assets"],
+        "outputs": ["client_performance", "client_asset_type_performance"],
+    },
+    "07_attribution_cube": {
+        "script": "02_intermediate/07_attribution_cube.py",
+        "inputs": ["cleaned_transactions", "assets"],
+        "outputs": ["attribution_cube.parquet"],
+    },
+    "08_brinson_attribution": {
+        "script": "02_intermediate/08_brinson_attribution.py",
+        "inputs": ["benchmarks"],
+        "outputs": ["brinson_attribution"],
+    },
+    "09_streaming_nested_holdings": {
+        "script": "02_intermediate/09_streaming_nested_holdings.py",
+        "inputs": [],
+        "outputs": ["holdings_feed.ndjson", "holdings_streaming.parquet"],
+    },
+    "10_holdings_index": {
+        "script": "02_intermediate/10_holdings_index.py",
+        "args": ["--lookups", "1000"],
+        "inputs": ["holdings_streaming.parquet"],
+        "outputs": ["holdings_index/by_client.arrow", "holdings_index/by_asset.arrow"],
+    },
+    "11_materialized_totals": {
+        "script": "02_intermediate/11_materialized_totals.py",
+        "inputs": ["transactions"],
+        "outputs": ["materialized_totals/client_totals.arrow", "materialized_totals/asset_totals.arrow"],
+    },
+    "01_var_and_stress_testing": {
+        "script": "03_advanced/01_var_and_stress_testing.py",
+        "inputs": ["benchmarks"],
+        "outputs": ["portfolio_returns", "stress_test_results"],
+    },
+    "02_lazyframe_optimizations": {
+        "script": "03_advanced/02_lazyframe_optimizations.py",
+        "inputs": ["transactions", "clients", "assets"],
+        "outputs": [],
+    },
+    "03_performance_benchmarks_vs_pandas": {
+        "script": "03_advanced/03_performance_benchmarks_vs_pandas.py",
+        "inputs": ["transactions", "clients"],
+        "outputs": ["benchmark_results"],
+        "benchmark": True,
+    },
+    "04_id_encoding_benchmark": {
+        "script": "03_advanced/04_id_encoding_benchmark.py",
+        "inputs": [],
+        "outputs": [],
+        "benchmark": True,
+    },
+    "06_var_engine": {
+        "script": "03_advanced/06_var_engine.py",
+        "inputs": ["benchmarks"],
+        "outputs": ["var_results"],
+    },
+    "07_stress_grid": {
+        "script": "03_advanced/07_stress_grid.py",
+        "inputs": ["cleaned_transactions", "assets"],
+        "outputs": ["stress_grid_pnl.parquet"],
+    },
+    "08_risk_attribution": {
+        "script": "03_advanced/08_risk_attribution.py",
+        "inputs": [],
+        "outputs": ["risk_attribution"],
+    },
+    "09_var_backtest": {
+        "script": "03_advanced/09_var_backtest.py",
+        "inputs": ["portfolio_returns"],
+        "outputs": ["var_backtest"],
+    },
+}
+
+
+def resolve(name):
+    if "." in name:
+        return os.path.join(datasets_dir, name)
+    return dataset_path(datasets_dir, name)
+
+
+def producers():
+    """Map each output path to the stage that writes it"""
+    return {resolve(out): stage for stage, spec in STAGES.items() for out in spec["outputs"]}
+
+
+def dependencies(stage, produced_by):
+    paths = [resolve(name) for name in STAGES[stage]["inputs"]]
+    return {produced_by[path] for path in paths if path in produced_by}
+
+
+def with_upstream(targets, produced_by):
+    """The requested stages plus everything they depend on"""
+    selected, pending = set(), list(targets)
+    while pending:
+        stage = pending.pop()
+        if stage not in selected:
+            selected.add(stage)
+            pending.extend(dependencies(stage, produced_by))
+    return selected
+
+
+def code_hash(stage):
+    digest = hashlib.blake2b(digest_size=16)
+    for path in [os.path.join(BASE_DIR, STAGES[stage]["script"])] + SHARED_CODE:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    digest.update(json.dumps(STAGES[stage].get("args", [])).encode())
+    return digest.hexdigest()
+
+
+def files_hash(names):
+    """Hash of each named dataset, or None when any of them is missing"""
+    hashes = {}
+    for name in names:
+        path = resolve(name)
+        if not os.path.exists(path):
+            return None
+        hashes[name] = source_hash(path)
+    return hashes
+
+
+def fingerprint(stage):
+    spec = STAGES[stage]
+    return {
+        "code": code_hash(stage),
+        "inputs": files_hash(spec["inputs"]),
+        "outputs": files_hash(spec["outputs"]),
+    }
+
+
+def is_up_to_date(stage, state):
+    previous = state.get(stage)
+    if previous is None:
+        return False
+    current = fingerprint(stage)
+    return current["outputs"] is not None and current == previous
+
+
+def run_script(stage):
+    """Run one stage in its own Python process and capture its output"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, os.path.join(BASE_DIR, STAGES[stage]["script"]), *STAGES[stage].get("args", [])],
+        cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    return proc.returncode, proc.stdout + proc.stderr, time.perf_counter() - start
+
+
+def load_state():
+    if not os.path.exists(STATE_FILE):
+        return {}
+    with open(STATE_FILE) as f:
+        return json.load(f)
+
+
+def save_state(state):
+    tmp = f"{STATE_FILE}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, STATE_FILE)
+
+
+def default_stages(benchmarks=False):
+    """Every stage, without the benchmark stages unless asked for"""
+    return [stage for stage, spec in STAGES.items() if benchmarks or not spec.get("benchmark")]
+
+
+def run_pipeline(targets=None, jobs=None, force=False, dry_run=False, benchmarks=False):
+    produced_by = producers()
+    selected = with_upstream(targets or default_stages(benchmarks), produced_by)
+    deps = {stage: dependencies(stage, produced_by) & selected for stage in selected}
+    state = {} if force else load_state()
+    saved_state = load_state()
+
+    done, failed, running = set(), set(), {}
+    ran, skipped = [], []
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        while len(done) + len(failed) < len(selected):
+            blocked = {s for s in selected - done - failed - set(running.values()) if deps[s] & failed}
+            failed |= blocked
+            ready = sorted(
+                s for s in selected - done - failed - set(running.values()) if deps[s] <= done
+            )
+            for stage in ready:
+                # Inputs are hashed after upstream stages finish, so a rerun that
+                # reproduces identical data does not cascade downstream. A dry run
+                # cannot know that, so it treats anything downstream as stale.
+                upstream_stale = dry_run and bool(deps[stage] & set(ran))
+                if not upstream_stale and is_up_to_date(stage, state):
+                    done.add(stage)
+                    skipped.append(stage)
+                    print(f"[skip] {stage}")
+                elif dry_run:
+                    done.add(stage)
+                    ran.append(stage)
+                    print(f"[would run] {stage}")
+                else:
+                    print(f"[run]  {stage}")
+                    running[pool.submit(run_script, stage)] = stage
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                returncode, output, elapsed = future.result()
+                if returncode == 0:
+                    done.add(stage)
+                    ran.append(stage)
+                    saved_state[stage] = fingerprint(stage)
+                    save_state(saved_state)
+                    print(f"[done] {stage} ({elapsed:.2f}s)")
+                else:
+                    failed.add(stage)
+                    saved_state.pop(stage, None)
+                    save_state(saved_state)
+                    print(f"[FAIL] {stage} (exit {returncode})\n{output}")
+
+    print(f"\n{len(ran)} {'would run' if dry_run else 'ran'}, {len(skipped)} skipped, "
+          f"{len(failed)} failed")
+    return not failed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the tutorial scripts as an incremental DAG")
+    parser.add_argument("stages", nargs="*",
+                        help=f"stages to bring up to date (default: all): {', '.join(STAGES)}")
+    parser.add_argument("--jobs", type=int, default=None, help="parallel stages (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="ignore recorded state and rerun")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would run")
+    parser.add_argument("--benchmarks", action="store_true",
+                        help="also run the benchmark stages (left out by default)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        sys.exit(f"Unknown stages: {', '.join(sorted(unknown))}")
+    ok = run_pipeline(args.stages or None, jobs=args.jobs, force=args.force, dry_run=args.dry_run,
+                      benchmarks=args.benchmarks)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,29 @@
+"""
+Shared pytest setup: the repository root on sys.path (for utils/) and an
+opt-in "slow" marker for tests that generate multi-GB data.
+
+Slow tests are skipped unless LEARN_POLARS_SLOW_TESTS=1 is set:
+
+    python -m pytest -q                            # fast tests
+    LEARN_POLARS_SLOW_TESTS=1 python -m pytest -q  # everything
+"""
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_ROOT)
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: generates large data; run with LEARN_POLARS_SLOW_TESTS=1")
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.environ.get("LEARN_POLARS_SLOW_TESTS") == "1":
+        return
+    skip = pytest.mark.skip(reason="slow; set LEARN_POLARS_SLOW_TESTS=1 to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,61 @@
+"""
+Incremental rolling statistics (utils/rolling.py) against a full recompute.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from utils.rolling import VALUE_COL, full_recompute, ewm_update, scan, unseen_rows, update
+
+
+def benchmark_series(n=200, seed=42):
+    rng = np.random.default_rng(seed)
+    return pl.DataFrame({
+        "date": pl.datetime_range(datetime(2020, 1, 1), datetime(2020, 1, 1) + timedelta(days=n - 1), interval="1d", eager=True),
+        VALUE_COL: rng.normal(0, 0.01, n),
+    })
+
+
+def append_in_batches(series, out_dir, sizes, fmt):
+    offset = 0
+    for size in sizes:
+        update(series.slice(offset, size), out_dir, fmt=fmt)
+        offset += size
+    assert offset == series.height
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "ipc", "csv"])
+def test_appended_partitions_match_full_recompute(tmp_path, fmt):
+    series = benchmark_series()
+    # Batches shorter and longer than both windows, including a single row
+    append_in_batches(series, tmp_path, [1, 5, 40, 3, 100, 51], fmt)
+
+    assert_frame_equal(scan(tmp_path, fmt).collect(), full_recompute(series), check_exact=False)
+
+
+def test_ewm_update_carries_state_across_partitions():
+    values = benchmark_series().select(VALUE_COL)
+    expected = values.select(pl.col(VALUE_COL).ewm_mean(alpha=0.2).alias("ewma_alpha_0.2"))
+
+    parts, num, den = [], 0.0, 0.0
+    for offset, length in [(0, 1), (1, 29), (30, 70), (100, 100)]:
+        part, num, den = ewm_update(values.slice(offset, length), num, den)
+        parts.append(part.select("ewma_alpha_0.2"))
+
+    assert_frame_equal(pl.concat(parts), expected, check_exact=False)
+
+
+def test_only_unseen_rows_are_appended(tmp_path):
+    series = benchmark_series()
+    update(series.head(120), tmp_path, fmt="parquet")
+
+    new_rows = unseen_rows(series, tmp_path)
+    assert new_rows.equals(series.slice(120))
+    with pytest.raises(ValueError):
+        update(series.slice(100, 30), tmp_path, fmt="parquet")
+
+    update(new_rows, tmp_path, fmt="parquet")
+    assert_frame_equal(scan(tmp_path, "parquet").collect(), full_recompute(series), check_exact=False)
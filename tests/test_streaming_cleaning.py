@@ -0,0 +1,57 @@
+"""
+Peak memory of 01_basics/04_streaming_data_cleaning.py on a multi-GB input.
+
+The streaming engine's memory use should depend on the chunk size, not on
+the input size. The test generates a --scale history as CSV part files
+(~58 MB per scale unit, so the default 40 is ~2.3 GB), cleans it in a
+subprocess and checks that process's peak RSS (ru_maxrss from wait4)
+against a budget well below the input size.
+
+    LEARN_POLARS_SLOW_TESTS=1 python -m pytest -q tests/test_streaming_cleaning.py
+    LEARN_POLARS_SLOW_TESTS=1 LEARN_POLARS_RSS_SCALE=100 LEARN_POLARS_RSS_BUDGET_MB=1024 python -m pytest ...
+"""
+import os
+import sys
+import glob
+import subprocess
+
+import polars as pl
+import pytest
+
+from conftest import REPO_ROOT
+
+SCALE = float(os.environ.get("LEARN_POLARS_RSS_SCALE", "40"))
+BUDGET_MB = float(os.environ.get("LEARN_POLARS_RSS_BUDGET_MB", "1024"))
+CHUNK_SIZE = 100_000
+
+
+def peak_rss_of(cmd):
+    """Run cmd to completion and return its peak RSS in MB (Linux reports KB)"""
+    proc = subprocess.Popen(cmd, cwd=REPO_ROOT, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    assert proc.returncode == 0, f"{cmd} exited with {proc.returncode}"
+    return usage.ru_maxrss / 1024
+
+
+@pytest.mark.slow
+def test_streaming_clean_stays_under_rss_budget(tmp_path):
+    out_dir = tmp_path / "history"
+    subprocess.run(
+        [sys.executable, "datasets/generate_datasets.py", "--scale", str(SCALE),
+         "--format", "csv", "--out", str(out_dir)],
+        cwd=REPO_ROOT, check=True, stdout=subprocess.DEVNULL,
+    )
+    source = str(out_dir / "transactions" / "*.csv")
+    input_mb = sum(os.path.getsize(p) for p in glob.glob(source)) / 1024 ** 2
+    assert input_mb > 2 * BUDGET_MB, "the input should be well above the memory budget"
+
+    output = tmp_path / "cleaned.parquet"
+    peak_mb = peak_rss_of([
+        sys.executable, "01_basics/04_streaming_data_cleaning.py",
+        "--source", source, "--output", str(output), "--chunk-size", str(CHUNK_SIZE),
+    ])
+
+    assert peak_mb < BUDGET_MB, f"peak RSS {peak_mb:,.0f} MB on {input_mb:,.0f} MB of input"
+    rows = pl.scan_parquet(output).select(pl.len()).collect().item()
+    assert 0 < rows <= SCALE * 1_000_000
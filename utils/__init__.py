@@ -0,0 +1 @@
+"""Shared helpers used by the tutorial scripts (storage, loading, benchmarking)."""
@@ -0,0 +1,116 @@
+"""
+backtest.py
+Rolling historical VaR backtests with Kupiec and Christoffersen tests.
+
+The input is a long (portfolio, date, pnl) frame sorted by portfolio and date.
+For every portfolio and day, the VaR forecast is the rolling quantile of the
+previous `window` days of P&L (rolling_quantile(...).shift(1).over(portfolio)),
+so the whole history is one vectorized expression rather than a quantile()
+call per day. A day is an exception when the realized P&L falls below -VaR.
+
+Per portfolio and VaR level the summary reports the exception count and three
+likelihood-ratio statistics:
+
+- Kupiec POF: is the exception rate equal to the expected 1 - confidence?
+- Christoffersen independence: do exceptions cluster (is an exception more
+  likely the day after another one)?
+- Conditional coverage: the sum of both, chi-square with 2 degrees of freedom.
+"""
+import math
+
+import numpy as np
+import polars as pl
+
+# 5% critical values of the chi-square distribution with 1 and 2 degrees of freedom
+CHI2_1_CRITICAL = 3.841
+CHI2_2_CRITICAL = 5.991
+
+
+def xlogy(n, p):
+    """n * log(p), taken as 0 when n is 0 (the usual convention in likelihood ratios)"""
+    return pl.when(n > 0).then(n * p.log()).otherwise(0.0)
+
+
+def rolling_var(frame, confidence, window, keys="portfolio"):
+    """Add the rolling VaR forecast and the exception flag for one confidence level"""
+    forecast = (
+        pl.col("pnl").rolling_quantile(quantile=1 - confidence, window_size=window)
+                     .shift(1).over(keys)
+    )
+    return (
+        frame.with_columns((-forecast).alias("VaR"))
+             .filter(pl.col("VaR").is_not_null())
+             .with_columns((pl.col("pnl") < -pl.col("VaR")).cast(pl.UInt32).alias("exception"))
+    )
+
+
+def exception_statistics(exceptions, confidence, keys="portfolio"):
+    """Exception counts and Kupiec / Christoffersen LR statistics per portfolio"""
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    p = 1 - confidence
+    hit = pl.col("exception")
+    prev = pl.col("exception").shift(1).over(keys)
+    counts = (
+        exceptions.with_columns(prev.alias("_prev"))
+                  .group_by(keys)
+                  .agg([
+                      pl.len().alias("days"),
+                      hit.sum().alias("exceptions"),
+                      ((pl.col("_prev") == 0) & (hit == 0)).sum().alias("n00"),
+                      ((pl.col("_prev") == 0) & (hit == 1)).sum().alias("n01"),
+                      ((pl.col("_prev") == 1) & (hit == 0)).sum().alias("n10"),
+                      ((pl.col("_prev") == 1) & (hit == 1)).sum().alias("n11"),
+                  ])
+                  .with_columns(pl.col(["days", "exceptions", "n00", "n01", "n10", "n11"]).cast(pl.Float64))
+    )
+
+    n, x = pl.col("days"), pl.col("exceptions")
+    n00, n01, n10, n11 = pl.col("n00"), pl.col("n01"), pl.col("n10"), pl.col("n11")
+    rate = x / n
+    pi0 = n01 / (n00 + n01)
+    pi1 = n11 / (n10 + n11)
+    pi = (n01 + n11) / (n00 + n01 + n10 + n11)
+
+    lr_pof = -2 * (xlogy(n - x, pl.lit(1 - p)) + xlogy(x, pl.lit(p))
+                   - xlogy(n - x, 1 - rate) - xlogy(x, rate))
+    lr_ind = -2 * (xlogy(n00 + n10, 1 - pi) + xlogy(n01 + n11, pi)
+                   - xlogy(n00, 1 - pi0) - xlogy(n01, pi0)
+                   - xlogy(n10, 1 - pi1) - xlogy(n11, pi1))
+    return (
+        counts.with_columns([
+            pl.lit(confidence).alias("confidence"),
+            (n * p).alias("expected_exceptions"),
+            rate.alias("exception_rate"),
+            lr_pof.alias("LR_pof"),
+            lr_ind.fill_nan(0.0).alias("LR_ind"),
+        ])
+        .with_columns((pl.col("LR_pof") + pl.col("LR_ind")).alias("LR_cc"))
+        .with_columns([
+            (pl.col("LR_pof") > CHI2_1_CRITICAL).alias("reject_pof"),
+            (pl.col("LR_ind") > CHI2_1_CRITICAL).alias("reject_ind"),
+            (pl.col("LR_cc") > CHI2_2_CRITICAL).alias("reject_cc"),
+        ])
+        .with_columns(pl.col(["days", "exceptions"]).cast(pl.UInt32))
+        .drop("n00", "n01", "n10", "n11")
+    )
+
+
+def with_p_values(summary):
+    """p-values of the three LR statistics (chi-square with 1, 1 and 2 degrees of freedom)"""
+    chi2_1 = np.vectorize(lambda x: math.erfc(math.sqrt(max(x, 0.0) / 2)))
+    return summary.with_columns([
+        pl.Series("p_pof", chi2_1(summary["LR_pof"].to_numpy()) if summary.height else []),
+        pl.Series("p_ind", chi2_1(summary["LR_ind"].to_numpy()) if summary.height else []),
+        (-pl.col("LR_cc") / 2).exp().alias("p_cc"),
+    ])
+
+
+def backtest(frame, confidence_levels=(0.95, 0.99), window=250, keys="portfolio"):
+    """Backtest summary per portfolio and confidence level, collected in one batch"""
+    lf = frame.lazy()
+    summaries = pl.collect_all([
+        exception_statistics(rolling_var(lf, confidence, window, keys), confidence, keys)
+        for confidence in confidence_levels
+    ])
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    return with_p_values(pl.concat(summaries).sort(keys + ["confidence"]))
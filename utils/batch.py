@@ -0,0 +1,81 @@
+"""
+batch.py
+Run many lazy queries together so shared sources are scanned once.
+
+Collecting queries one by one re-reads every source for each of them. A
+QueryBatch registers named LazyFrames and runs them in a single
+pl.collect_all() call with common-subplan elimination: subplans shared by
+several queries (the same scan, or the same filtered/joined frame) are
+computed once and fed to every query that uses them.
+
+compare() times sequential collection against the batch and counts the
+source scans in both plans, so the saving is visible per batch. Plans that
+differ right at the scan (for example two different pushed-down filters on
+the same file) still need their own scans; build such queries from one shared
+intermediate LazyFrame to let them share it.
+"""
+import re
+
+import polars as pl
+
+from utils.bench import measure, summarize
+
+SCAN_PATTERN = re.compile(r"SCAN \[")
+CACHE_PATTERN = re.compile(r"CACHE\[id: ([^,\]]+)")
+NODE_ID_PATTERN = re.compile(r"\s*\[id: \d+\]")
+
+
+def count_scans(plan):
+    """Source scans executed by an explained plan; a scan under a shared CACHE node counts once"""
+    scans, caches = set(), []
+    for n, line in enumerate(plan.splitlines()):
+        indent = len(line) - len(line.lstrip())
+        while caches and caches[-1][0] >= indent:
+            caches.pop()
+        cache = CACHE_PATTERN.search(line)
+        if cache:
+            caches.append((indent, cache.group(1)))
+        elif SCAN_PATTERN.search(line):
+            # Under a cache, the scan runs once however often the plan prints it
+            scans.add((caches[-1][1], NODE_ID_PATTERN.sub("", line.strip())) if caches else n)
+    return len(scans)
+
+
+class QueryBatch:
+    """Named lazy queries collected together with common-subplan elimination"""
+
+    def __init__(self, **collect_kwargs):
+        self.queries = {}
+        self.collect_kwargs = collect_kwargs
+        self.optimizations = pl.QueryOptFlags(comm_subplan_elim=True)
+
+    def add(self, name, lf):
+        self.queries[name] = lf
+        return lf
+
+    def explain(self):
+        """One plan for the whole batch, with shared subplans as CACHE nodes"""
+        return pl.explain_all(list(self.queries.values()), optimizations=self.optimizations)
+
+    def collect(self):
+        """{name: DataFrame} for every registered query, from one collect_all()"""
+        frames = pl.collect_all(list(self.queries.values()), optimizations=self.optimizations,
+                                **self.collect_kwargs)
+        return dict(zip(self.queries, frames))
+
+    def collect_sequential(self):
+        return {name: lf.collect(**self.collect_kwargs) for name, lf in self.queries.items()}
+
+    def compare(self, repeat=5, warmups=1):
+        """Median time of sequential vs batched collection, and source scans in each"""
+        sequential = summarize(measure(self.collect_sequential, repeat, warmups))["median"]
+        batched = summarize(measure(self.collect, repeat, warmups))["median"]
+        return {
+            "queries": len(self.queries),
+            "sequential_s": sequential,
+            "batched_s": batched,
+            "saved_s": sequential - batched,
+            "speedup": sequential / batched if batched else float("nan"),
+            "sequential_scans": sum(count_scans(lf.explain()) for lf in self.queries.values()),
+            "batched_scans": count_scans(self.explain()),
+        }
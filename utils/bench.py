@@ -0,0 +1,196 @@
+"""
+bench.py
+A small benchmark harness with robust statistics and regression tracking.
+
+measure() times a callable with perf_counter_ns after configurable warm-up runs.
+summarize() reports median, p95 and MAD after rejecting outliers with the
+modified z-score (|x - median| / MAD scaled > 3.5). Each run can be appended to
+a JSON-lines history together with machine and library metadata, and compared
+against a stored baseline: a benchmark is flagged as a regression only when
+its median is slower by more than min_effect AND a one-sided Mann-Whitney U
+test on the raw samples says the slowdown is significant.
+"""
+import os
+import sys
+import json
+import math
+import platform
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import polars as pl
+
+OUTLIER_Z = 3.5
+# Scales MAD to the standard deviation of a normal distribution
+MAD_SCALE = 1.4826
+
+
+def measure(fn, repeat=10, warmups=1):
+    """Run fn warmups times untimed, then repeat times; return durations in seconds"""
+    for _ in range(warmups):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        fn()
+        samples.append((time.perf_counter_ns() - start) / 1e9)
+    return samples
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def mad(values):
+    values = np.asarray(values, dtype=float)
+    return float(np.median(np.abs(values - np.median(values))))
+
+
+def reject_outliers(samples, z=OUTLIER_Z):
+    """Drop samples whose modified z-score exceeds z"""
+    values = np.asarray(samples, dtype=float)
+    spread = mad(values) * MAD_SCALE
+    if spread == 0:
+        return values.tolist()
+    keep = np.abs(values - np.median(values)) / spread <= z
+    return values[keep].tolist()
+
+
+def summarize(samples, z=OUTLIER_Z):
+    kept = reject_outliers(samples, z)
+    return {
+        "runs": len(samples),
+        "outliers": len(samples) - len(kept),
+        "median": float(np.median(kept)),
+        "p95": float(np.percentile(kept, 95)),
+        "mad": mad(kept),
+        "mean": float(np.mean(kept)),
+        "min": float(np.min(kept)),
+    }
+
+
+def environment():
+    """Machine and library versions the numbers were measured on"""
+    import pandas as pd
+
+    try:
+        threads = pl.thread_pool_size()
+    except AttributeError:  # older Polars
+        threads = pl.threadpool_size()
+    return {
+        "hostname": platform.node(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": sys.version.split()[0],
+        "polars": pl.__version__,
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "polars_threads": threads,
+    }
+
+
+def run_benchmark(name, fn, repeat=10, warmups=1, **params):
+    """Measure fn and return a result record ready for the history file"""
+    samples = measure(fn, repeat=repeat, warmups=warmups)
+    return {
+        "name": name,
+        "params": params,
+        "warmups": warmups,
+        "samples": samples,
+        "stats": summarize(samples),
+    }
+
+
+def mann_whitney_greater(current, baseline):
+    """One-sided p-value that current samples are larger than baseline samples"""
+    x = np.asarray(current, dtype=float)
+    y = np.asarray(baseline, dtype=float)
+    n1, n2 = len(x), len(y)
+    ranks = pl.Series(np.concatenate([x, y])).rank("average").to_numpy()
+    u = ranks[:n1].sum() - n1 * (n1 + 1) / 2
+    mu = n1 * n2 / 2
+    sigma = math.sqrt(n1 * n2 * (n1 + n2 + 1) / 12)
+    if sigma == 0:
+        return 1.0
+    # Normal approximation with continuity correction
+    z = (u - mu - 0.5) / sigma
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(result, baseline, alpha=0.05, min_effect=0.05):
+    """Compare one result with its baseline record"""
+    current_median = result["stats"]["median"]
+    baseline_median = baseline["stats"]["median"]
+    change = current_median / baseline_median - 1
+    p_value = mann_whitney_greater(result["samples"], baseline["samples"])
+    return {
+        "name": result["name"],
+        "baseline_median": baseline_median,
+        "median": current_median,
+        "change_pct": change * 100,
+        "p_value": p_value,
+        "regression": change > min_effect and p_value < alpha,
+    }
+
+
+def append_history(results, path):
+    """Append results (with a timestamp and environment) to a JSON-lines history"""
+    meta = {"timestamp": datetime.now(timezone.utc).isoformat(), "environment": environment()}
+    with open(path, "a") as f:
+        for result in results:
+            f.write(json.dumps({**meta, **result}) + "\n")
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, path):
+    """Store results as the new baseline, keyed by benchmark name"""
+    baseline = load_baseline(path)
+    env = environment()
+    for result in results:
+        baseline[result["name"]] = {**result, "environment": env}
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+
+
+def check_regressions(results, baseline_path, alpha=0.05, min_effect=0.05):
+    """Compare results with the stored baseline; returns one row per compared benchmark"""
+    baseline = load_baseline(baseline_path)
+    return [
+        compare(result, baseline[result["name"]], alpha, min_effect)
+        for result in results if result["name"] in baseline
+    ]
+
+
+def report(results, history_path, baseline_path, update_baseline=False):
+    """Append to history, print the baseline comparison and optionally rebaseline"""
+    append_history(results, history_path)
+    comparisons = check_regressions(results, baseline_path)
+    if comparisons:
+        print("\nComparison with baseline:")
+        print(pl.DataFrame(comparisons))
+        for row in comparisons:
+            if row["regression"]:
+                print(f"REGRESSION: {row['name']} is {row['change_pct']:.1f}% slower "
+                      f"(p={row['p_value']:.4f})")
+    # Benchmarks seen for the first time become their own baseline
+    known = load_baseline(baseline_path)
+    to_save = results if update_baseline else [r for r in results if r["name"] not in known]
+    if to_save:
+        save_baseline(to_save, baseline_path)
+        print(f"Baseline updated for {len(to_save)} benchmark(s): {baseline_path}")
+    return comparisons
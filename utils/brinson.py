@@ -0,0 +1,99 @@
+"""
+brinson.py
+Brinson-Fachler performance attribution with Carino multi-period linking.
+
+Inputs are long tables:
+
+- portfolio: (portfolio, period, sector, weight, return)
+- benchmark: (period, sector, weight, return)
+
+For every portfolio, period and sector the excess return over the benchmark
+splits into
+
+    allocation  = (w_p - w_b) * (r_b - R_b)
+    selection   = w_b * (r_p - r_b)
+    interaction = (w_p - w_b) * (r_p - r_b)
+
+where lower-case r are sector returns and R_b the total benchmark return of the
+period. The three effects summed over sectors equal R_p - R_b for the period.
+Sectors the portfolio does not hold get w_p = 0 and r_p = r_b; the benchmark is
+expected to cover every sector.
+
+Single-period effects do not add up over time because returns compound.
+link_effects() rescales each period with Carino's log-linking coefficients
+k_t = ln((1 + R_p,t) / (1 + R_b,t)) / (R_p,t - R_b,t) relative to the same
+coefficient K for the whole horizon, so the linked effects sum exactly to the
+cumulative excess return. Everything is joins and grouped aggregations in one
+lazy query.
+"""
+import polars as pl
+
+EFFECTS = ["allocation", "selection", "interaction"]
+
+
+def log_ratio_coefficient(rp, rb):
+    """Carino coefficient ln((1+rp)/(1+rb)) / (rp - rb), with its limit 1/(1+r) when rp == rb"""
+    return (
+        pl.when((rp - rb).abs() > 1e-12)
+          .then(((1 + rp).log() - (1 + rb).log()) / (rp - rb))
+          .otherwise(1 / (1 + rp))
+    )
+
+
+def period_effects(portfolio, benchmark, keys="portfolio"):
+    """Allocation, selection and interaction per portfolio, period and sector"""
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    portfolio, benchmark = portfolio.lazy(), benchmark.lazy()
+    bench = benchmark.select([
+        "period", "sector",
+        pl.col("weight").alias("w_b"),
+        pl.col("return").alias("r_b"),
+        (pl.col("weight") * pl.col("return")).sum().over("period").alias("R_b"),
+    ])
+    # Every benchmark sector for every portfolio and period, held or not
+    grid = portfolio.select(keys + ["period"]).unique().join(bench, on="period")
+    held = portfolio.select(keys + [
+        "period", "sector", pl.col("weight").alias("w_p"), pl.col("return").alias("r_p"),
+    ])
+    active = pl.col("w_p") - pl.col("w_b")
+    return (
+        grid.join(held, on=keys + ["period", "sector"], how="left")
+            .with_columns([
+                pl.col("w_p").fill_null(0.0),
+                pl.col("r_p").fill_null(pl.col("r_b")),
+            ])
+            .with_columns([
+                (active * (pl.col("r_b") - pl.col("R_b"))).alias("allocation"),
+                (pl.col("w_b") * (pl.col("r_p") - pl.col("r_b"))).alias("selection"),
+                (active * (pl.col("r_p") - pl.col("r_b"))).alias("interaction"),
+            ])
+            .with_columns((pl.col("w_p") * pl.col("r_p")).sum().over(keys + ["period"]).alias("R_p"))
+    )
+
+
+def link_effects(effects, keys="portfolio"):
+    """Carino-linked effects per portfolio and sector over all periods"""
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    per_period = effects.select(keys + ["period", "R_p", "R_b"]).unique()
+    horizon = (
+        per_period.group_by(keys)
+                  .agg([
+                      ((1 + pl.col("R_p")).log().sum().exp() - 1).alias("total_R_p"),
+                      ((1 + pl.col("R_b")).log().sum().exp() - 1).alias("total_R_b"),
+                  ])
+                  .with_columns(log_ratio_coefficient(pl.col("total_R_p"), pl.col("total_R_b")).alias("K"))
+    )
+    scale = log_ratio_coefficient(pl.col("R_p"), pl.col("R_b")) / pl.col("K")
+    return (
+        effects.join(horizon, on=keys)
+               .group_by(keys + ["sector"])
+               .agg([(pl.col(effect) * scale).sum().alias(effect) for effect in EFFECTS]
+                    + [pl.first("total_R_p"), pl.first("total_R_b")])
+               .with_columns(pl.sum_horizontal(EFFECTS).alias("total_effect"))
+               .sort(keys + ["sector"])
+    )
+
+
+def brinson_fachler(portfolio, benchmark, keys="portfolio"):
+    """Linked Brinson-Fachler effects per portfolio and sector, as a lazy query"""
+    return link_effects(period_effects(portfolio, benchmark, keys), keys)
@@ -0,0 +1,122 @@
+"""
+cube.py
+Pre-aggregated attribution cube with grouping sets, rollup and cube semantics.
+
+build_cube() scans the source once and aggregates it to the finest grain (all
+dimensions). Every requested grouping set is then re-aggregated from that
+small result instead of the raw rows, which is valid because the stored
+measures (sum, count, min, max) combine exactly. Dimensions that a grouping set
+rolls up are null, and a grouping_id bitmask says which ones: bit i is set when
+dims[i] is aggregated away, as in SQL's GROUPING_ID, so a rolled-up null is
+never confused with a null dimension value.
+
+The cube is written to Parquet sorted by grouping_id, so each grouping set
+lives in its own run of row groups. query_cube() answers a slice (group by
+some dimensions, filter on others) from the smallest stored grouping set that
+covers it; the grouping_id filter lets the Parquet reader skip every other
+row group.
+"""
+from itertools import combinations
+
+import polars as pl
+
+MEASURE_AGGS = {
+    "sum": lambda col: pl.sum(col),
+    "min": lambda col: pl.min(col),
+    "max": lambda col: pl.max(col),
+}
+# How each stored measure combines when rolling up further
+ROLLUP_AGGS = {"sum": pl.sum, "min": pl.min, "max": pl.max, "count": pl.sum}
+CUBE_ROW_GROUP_SIZE = 64_000
+
+
+def rollup(dims):
+    """Grouping sets of ROLLUP(dims): every prefix, down to the grand total"""
+    return [tuple(dims[:i]) for i in range(len(dims), -1, -1)]
+
+
+def cube(dims):
+    """Grouping sets of CUBE(dims): every subset"""
+    return [tuple(subset) for size in range(len(dims), -1, -1) for subset in combinations(dims, size)]
+
+
+def grouping_id(dims, grouping_set):
+    """Bitmask of the dimensions rolled up in a grouping set"""
+    return sum(1 << i for i, dim in enumerate(dims) if dim not in grouping_set)
+
+
+def measure_columns(measures):
+    """Stored column names: '<value>_<agg>' plus 'count'"""
+    return [f"{value}_{agg}" for value, aggs in measures.items() for agg in aggs] + ["count"]
+
+
+def build_cube(lf, dims, measures, grouping_sets):
+    """All grouping sets of lf from one scan.
+
+    measures maps value columns to aggregations, e.g. {"trade_value": ["sum", "min", "max"]}.
+    """
+    dims = list(dims)
+    base = (
+        lf.group_by(dims)
+          .agg([
+              MEASURE_AGGS[agg](value).alias(f"{value}_{agg}")
+              for value, aggs in measures.items() for agg in aggs
+          ] + [pl.len().alias("count")])
+          .collect()
+    )
+    schema = base.schema
+    parts = []
+    for grouping_set in dict.fromkeys(tuple(s) for s in grouping_sets):
+        rolled = (
+            base.group_by(list(grouping_set))
+                .agg([
+                    ROLLUP_AGGS[col.rsplit("_", 1)[-1]](col).alias(col)
+                    for col in measure_columns(measures)
+                ])
+            if grouping_set else
+            base.select([
+                ROLLUP_AGGS[col.rsplit("_", 1)[-1]](col).alias(col)
+                for col in measure_columns(measures)
+            ])
+        )
+        parts.append(rolled.select(
+            [pl.lit(grouping_id(dims, grouping_set), dtype=pl.UInt32).alias("grouping_id")]
+            + [pl.col(d) if d in grouping_set else pl.lit(None, dtype=schema[d]).alias(d) for d in dims]
+            + measure_columns(measures)
+        ))
+    return pl.concat(parts).sort(["grouping_id"] + dims)
+
+
+def write_cube(cube_df, path):
+    cube_df.write_parquet(path, row_group_size=CUBE_ROW_GROUP_SIZE, statistics=True)
+
+
+def query_cube(source, dims, by=(), where=None):
+    """Measures grouped by `by`, filtered on `where` ({dim: value}), answered from the cube.
+
+    source is a cube DataFrame/LazyFrame or the path of a written cube.
+    """
+    lf = pl.scan_parquet(source) if isinstance(source, str) else source.lazy()
+    by, where = list(by), dict(where or {})
+    needed = set(by) | set(where)
+    stored = lf.select(pl.col("grouping_id").unique()).collect()["grouping_id"].to_list()
+    # Smallest stored grouping set (most dimensions rolled up) that has every needed dimension
+    candidates = [
+        gid for gid in stored
+        if all(not gid & (1 << dims.index(dim)) for dim in needed)
+    ]
+    if not candidates:
+        raise ValueError(f"No grouping set in the cube covers {sorted(needed)}")
+    gid = max(candidates, key=lambda g: bin(g).count("1"))
+
+    measures = [c for c in lf.collect_schema().names() if c != "grouping_id" and c not in dims]
+    sliced = lf.filter(pl.col("grouping_id") == gid)
+    for dim, value in where.items():
+        sliced = sliced.filter(pl.col(dim) == value)
+    if set(by) == {d for i, d in enumerate(dims) if not gid & (1 << i)}:
+        return sliced.select(by + measures).sort(by).collect()
+    # The covering set is finer than requested: roll it up further
+    aggs = [ROLLUP_AGGS[col.rsplit("_", 1)[-1]](col).alias(col) for col in measures]
+    if not by:
+        return sliced.select(aggs).collect()
+    return sliced.group_by(by).agg(aggs).sort(by).collect()
@@ -0,0 +1,99 @@
+"""
+date_range.py
+Date-range reads of date-sorted transactions without a full filter.
+
+In memory, date_slice() binary-searches the sorted date column (search_sorted)
+and returns a zero-copy slice, instead of evaluating a filter on every row.
+
+On disk, transactions written through utils/storage.py are Parquet files with
+day-aligned row groups and min/max date statistics. DateRangeIndex reads
+every footer once into a small (file, row_group, rows, min_date, max_date)
+table; query(start, end) then reads only the row groups whose [min, max]
+overlaps [start, end) and trims the first and last group with a binary
+search. last_read reports how many row groups and rows were read.
+"""
+import os
+import glob
+from datetime import date, datetime, time
+
+import polars as pl
+import pyarrow.parquet as pq
+
+
+def as_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time())
+    return datetime.fromisoformat(value)
+
+
+def date_slice(df, start, end, date_col="date"):
+    """Rows with start <= date < end of a frame sorted by date_col, by binary search"""
+    dates = df[date_col]
+    if not dates.flags["SORTED_ASC"] and not dates.is_sorted():
+        raise ValueError(f"{date_col} is not sorted; sort the frame or use a filter")
+    bounds = pl.Series([as_datetime(start), as_datetime(end)]).cast(dates.dtype)
+    first, last = dates.search_sorted(bounds, side="left").to_list()
+    return df.slice(first, last - first)
+
+
+def parquet_files(source):
+    """Parquet files of a dataset file or directory"""
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, "**", "*.parquet"), recursive=True))
+    return [source]
+
+
+class DateRangeIndex:
+    """Row-group pruning index over date-sorted Parquet files"""
+
+    def __init__(self, source, date_col="date"):
+        self.date_col = date_col
+        self.files = parquet_files(source)
+        self.row_groups = None
+        self.last_read = {}
+
+    def _footer_rows(self, path):
+        metadata = pq.ParquetFile(path).metadata
+        column = metadata.schema.names.index(self.date_col)
+        for i in range(metadata.num_row_groups):
+            group = metadata.row_group(i)
+            stats = group.column(column).statistics
+            if stats is None or not stats.has_min_max:
+                raise ValueError(f"{path} row group {i} has no {self.date_col} statistics")
+            yield path, i, group.num_rows, stats.min, stats.max
+
+    def build(self):
+        """Read every footer into the (file, row_group, rows, min, max) table"""
+        rows = [row for path in self.files for row in self._footer_rows(path)]
+        self.row_groups = pl.DataFrame(
+            rows, schema=["file", "row_group", "rows", "min_date", "max_date"], orient="row",
+        ).with_columns(pl.col("min_date", "max_date").cast(pl.Datetime("us")))
+        return self
+
+    def query(self, start, end, columns=None):
+        """Rows with start <= date < end, reading only the row groups that can hold them"""
+        start, end = as_datetime(start), as_datetime(end)
+        if self.row_groups is None:
+            self.build()
+        wanted = self.row_groups.filter(
+            (pl.col("max_date") >= start) & (pl.col("min_date") < end)
+        ).sort(["min_date", "file", "row_group"])
+        if columns is not None and self.date_col not in columns:
+            columns = [self.date_col, *columns]
+
+        frames = []
+        for (path,), groups in wanted.group_by("file", maintain_order=True):
+            table = pq.ParquetFile(path).read_row_groups(groups["row_group"].to_list(), columns=columns)
+            frames.append(pl.from_arrow(table))
+        self.last_read = {
+            "row_groups": wanted.height,
+            "total_row_groups": self.row_groups.height,
+            "rows_read": int(wanted["rows"].sum()),
+            "total_rows": int(self.row_groups["rows"].sum()),
+        }
+        if not frames:
+            schema = pl.scan_parquet(self.files[0]).collect_schema()
+            return pl.DataFrame(schema={c: schema[c] for c in (columns or schema.names())})
+        return date_slice(pl.concat(frames), start, end, self.date_col)
@@ -0,0 +1,117 @@
+"""
+holdings.py
+Nested client -> portfolio -> holding records, read lazily and flattened.
+
+The holdings feed is newline-delimited JSON, one client per line:
+
+    {"client_id": "C0001", "portfolios": [{"port_id": "P1", "holdings": ["A0001", "A0002"]}]}
+
+the record layout of datasets/nested.json. scan_holdings() scans it with a
+declared nested schema, so no inference pass reads the file first, and
+flatten_holdings() turns it into one (client_id, portfolio_id, holdings) row
+per holding as a single lazy plan. Sunk with the streaming engine, the file is
+processed in batches and never held in memory whole.
+
+Once flattened, "who holds asset X" and "what does client Y hold" would each
+need a scan of the whole table. build_holdings_index() stores two copies
+sorted by client_id and by asset_id as uncompressed Arrow IPC, each with a
+small (key, offset, length) index; HoldingsIndex memory-maps them and answers
+each lookup with a binary search and a slice.
+"""
+import os
+
+import numpy as np
+import polars as pl
+import pyarrow as pa
+
+from utils.ids import ID_PREFIXES
+
+HOLDINGS_SCHEMA = {
+    "client_id": pl.String,
+    "portfolios": pl.List(pl.Struct({
+        "port_id": pl.String,
+        "holdings": pl.List(pl.String),
+    })),
+}
+
+
+def scan_holdings(path):
+    return pl.scan_ndjson(path, schema=HOLDINGS_SCHEMA)
+
+
+def flatten_holdings(lf):
+    """client -> portfolio -> holding nesting as one row per holding"""
+    return (
+        lf.explode("portfolios")
+          .select([
+              "client_id",
+              pl.col("portfolios").struct.field("port_id").alias("portfolio_id"),
+              pl.col("portfolios").struct.field("holdings").alias("holdings"),
+          ])
+          .explode("holdings")
+          .drop_nulls("holdings")
+    )
+
+
+# Sorted layouts of the holdings index: file stem -> key column
+LAYOUTS = {"by_client": "client_id", "by_asset": "asset_id"}
+
+
+def build_holdings_index(holdings, out_dir):
+    """Write the holdings sorted by client and by asset, each with a (key, offset, length) index.
+
+    holdings has client_id and asset_id as integer keys (see utils.ids.encode_ids).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    for layout, key in LAYOUTS.items():
+        ordered = holdings.sort(key, maintain_order=True).rechunk()
+        index = (
+            ordered.group_by(key, maintain_order=True)
+                   .agg(pl.len().alias("length"))
+                   .with_columns((pl.col("length").cum_sum() - pl.col("length")).alias("offset"))
+                   .select([key, "offset", "length"])
+        )
+        # Uncompressed IPC can be memory-mapped and sliced without decoding
+        ordered.write_ipc(os.path.join(out_dir, f"{layout}.arrow"), compression="uncompressed")
+        index.write_ipc(os.path.join(out_dir, f"{layout}.index.arrow"), compression="uncompressed")
+
+
+def memory_map_ipc(path):
+    """Zero-copy DataFrame over a memory-mapped IPC file"""
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return pl.from_arrow(table, rechunk=False)
+
+
+class HoldingsIndex:
+    """Point lookups on the two sorted layouts written by build_holdings_index().
+
+    Each lookup is a binary search of the sorted key array followed by a
+    zero-copy slice of the memory-mapped layout, so its cost does not depend on
+    the size of the book.
+    """
+
+    def __init__(self, out_dir):
+        self.frames, self.keys, self.offsets, self.lengths = {}, {}, {}, {}
+        for layout in LAYOUTS:
+            self.frames[layout] = memory_map_ipc(os.path.join(out_dir, f"{layout}.arrow"))
+            index = memory_map_ipc(os.path.join(out_dir, f"{layout}.index.arrow"))
+            self.keys[layout] = index[LAYOUTS[layout]].to_numpy()
+            self.offsets[layout] = index["offset"].to_numpy()
+            self.lengths[layout] = index["length"].to_numpy()
+
+    def _lookup(self, layout, key):
+        if isinstance(key, str):
+            key = int(key[len(ID_PREFIXES[LAYOUTS[layout]]):])
+        keys = self.keys[layout]
+        i = np.searchsorted(keys, key)
+        if i == len(keys) or keys[i] != key:
+            return self.frames[layout].clear()
+        return self.frames[layout].slice(int(self.offsets[layout][i]), int(self.lengths[layout][i]))
+
+    def holdings_of_client(self, client_id):
+        """Every holding of one client ("C0001" or its integer key)"""
+        return self._lookup("by_client", client_id)
+
+    def holders_of_asset(self, asset_id):
+        """Every holding of one asset ("A0001" or its integer key)"""
+        return self._lookup("by_asset", asset_id)
@@ -0,0 +1,90 @@
+"""
+ids.py
+Integer surrogate keys for the prefixed string IDs.
+
+Client, asset and transaction IDs are zero-padded strings ("C0001", "A0001",
+"T000001"). Joining or grouping on them hashes and compares strings. Because
+every ID is a fixed prefix plus a number, the number itself is a perfect key:
+encode_ids strips the prefix and parses the digits into UInt32/UInt64 in one
+vectorized expression, and decode_ids formats the keys back into strings at
+output time. Both work on DataFrames and LazyFrames.
+
+The zero padding is not fixed: the generator widens IDs with the data size
+("C00042" at --scale 10). A key does not remember how many digits its string
+had, so encode_ids(..., widths=widths) records the width of each ID column it
+encodes into the widths dict, and decode_ids(..., widths=widths) pads with it.
+Decoding a column whose width was never recorded is an error rather than a
+guess.
+"""
+import polars as pl
+
+ID_PREFIXES = {"client_id": "C", "asset_id": "A", "transaction_id": "T"}
+KEY_DTYPES = {"client_id": pl.UInt32, "asset_id": pl.UInt32, "transaction_id": pl.UInt64}
+
+
+def encode_id(column):
+    """Expression mapping a prefixed ID column to its integer key"""
+    return (
+        pl.col(column).cast(pl.String)
+          .str.slice(len(ID_PREFIXES[column]))
+          .cast(KEY_DTYPES[column])
+          .alias(column)
+    )
+
+
+def decode_id(column, width):
+    """Expression mapping an integer key column back to its prefixed ID of width digits"""
+    return (
+        pl.lit(ID_PREFIXES[column]) + pl.col(column).cast(pl.String).str.zfill(width)
+    ).alias(column)
+
+
+def format_ids(prefix, keys, width):
+    """Build zero-padded string IDs ("C0001") from integer keys in one vectorized pass"""
+    return pl.select(
+        (pl.lit(prefix) + pl.Series(keys).cast(pl.String).str.zfill(width)).alias("id")
+    ).to_series()
+
+
+def id_width(n, minimum):
+    """Digits needed to keep IDs sortable as strings for n keys"""
+    return max(minimum, len(str(max(n - 1, 0))))
+
+
+def id_columns(frame, columns):
+    names = frame.collect_schema().names() if isinstance(frame, pl.LazyFrame) else frame.columns
+    return [c for c in (columns or ID_PREFIXES) if c in names]
+
+
+def id_widths(frame, columns=None):
+    """Digits of the widest ID in each prefixed ID column of a frame"""
+    columns = id_columns(frame, columns)
+    lengths = frame.lazy().select([
+        (pl.col(c).cast(pl.String).str.len_chars().max() - len(ID_PREFIXES[c])).alias(c)
+        for c in columns
+    ]).collect()
+    return {c: lengths[c][0] or 0 for c in columns}
+
+
+def encode_ids(frame, columns=None, widths=None):
+    """Replace the ID columns present in a frame with integer keys
+
+    If a widths dict is given, the width of every encoded column is recorded in
+    it for decode_ids (for a LazyFrame this reads the ID columns once).
+    """
+    columns = id_columns(frame, columns)
+    if widths is not None:
+        widths.update(id_widths(frame, columns))
+    return frame.with_columns([encode_id(c) for c in columns])
+
+
+def decode_ids(frame, widths, columns=None):
+    """Turn the integer key columns present in a frame back into prefixed IDs
+
+    widths holds the digits per column, as recorded by encode_ids.
+    """
+    columns = id_columns(frame, columns)
+    missing = [c for c in columns if c not in widths]
+    if missing:
+        raise ValueError(f"No recorded ID width for {missing}; pass widths=... to encode_ids")
+    return frame.with_columns([decode_id(c, widths[c]) for c in columns])
@@ -0,0 +1,163 @@
+"""
+loader.py
+Typed loading of the tutorial datasets with an Arrow IPC parse cache.
+
+Each dataset has a declared schema (Datetime dates, Categorical/Enum ids and
+labels, Float64 amounts), so scripts never re-infer types or re-parse date
+strings. The first load of a source file parses it once and stores the typed
+frame as Arrow IPC under datasets/.cache/, keyed by a hash of the source
+contents; later loads read the cached file directly. Editing or regenerating the
+source changes the hash and the cache is rebuilt automatically.
+
+Datasets stored in date order (utils.storage.SORTED_BY) come back with the
+sorted flag set on that column once the order has been checked, so sorts,
+group_bys, joins and search_sorted on it can take their sorted fast paths.
+"""
+import os
+import glob
+import hashlib
+from functools import lru_cache
+import polars as pl
+
+from utils.storage import SORTED_BY, data_format, dataset_path, read_dataset
+
+ASSET_TYPE = pl.Enum(["Equity", "Bond", "Commodity"])
+REGION = pl.Enum(["US", "EU", "APAC"])
+
+TRANSACTION_SCHEMA = {
+    "transaction_id": pl.String,
+    "client_id": pl.Categorical,
+    "asset_id": pl.Categorical,
+    "amount": pl.Float64,
+    "date": pl.Datetime("us"),
+}
+
+SCHEMAS = {
+    "transactions": TRANSACTION_SCHEMA,
+    "cleaned_transactions": TRANSACTION_SCHEMA,
+    "joined_transactions": {
+        "transaction_id": pl.String,
+        "client_id": pl.Categorical,
+        "name": pl.String,
+        "asset_type": ASSET_TYPE,
+        "amount": pl.Float64,
+        "date": pl.Datetime("us"),
+    },
+    "clients": {
+        "client_id": pl.Categorical,
+        "name": pl.String,
+        "join_date": pl.Datetime("us"),
+    },
+    "assets": {
+        "asset_id": pl.Categorical,
+        "asset_type": ASSET_TYPE,
+        "region": REGION,
+        "price": pl.Float64,
+    },
+    "benchmarks": {
+        "date": pl.Datetime("us"),
+        "benchmark_return": pl.Float64,
+    },
+}
+
+CACHE_DIRNAME = ".cache"
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def source_files(path):
+    """All files behind a dataset path (a single file or a hive directory)"""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "**", "*.*"), recursive=True))
+    return [path]
+
+
+def source_hash(path):
+    """Content hash of a dataset's source file(s)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for file in source_files(path):
+        digest.update(os.path.relpath(file, path).encode())
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_dataset(datasets_dir, name, fmt):
+    """Read a dataset from its source and apply the declared schema"""
+    schema = SCHEMAS[name]
+    if fmt == "csv":
+        return pl.read_csv(dataset_path(datasets_dir, name, fmt), schema_overrides=schema)
+    df = read_dataset(datasets_dir, name, fmt)
+    return df.with_columns([
+        pl.col(col).cast(dtype) for col, dtype in schema.items() if col in df.columns
+    ])
+
+
+def cached_path(datasets_dir, name, fmt=None):
+    """Build (if needed) and return the IPC cache file for a dataset"""
+    fmt = data_format(name, fmt)
+    source = dataset_path(datasets_dir, name, fmt)
+    cache_dir = os.path.join(datasets_dir, CACHE_DIRNAME)
+    path = os.path.join(cache_dir, f"{name}.{fmt}.{source_hash(source)}.arrow")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        # Drop caches built from older versions of this source
+        for stale in glob.glob(os.path.join(cache_dir, f"{name}.{fmt}.*.arrow")):
+            if stale != path:
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:  # removed by a concurrent loader
+                    pass
+        df = parse_dataset(datasets_dir, name, fmt)
+        # Per-process temp file, so concurrent pipeline stages never clobber each other
+        tmp = f"{path}.{os.getpid()}.tmp"
+        df.write_ipc(tmp)
+        os.replace(tmp, path)
+    return path
+
+
+@lru_cache(maxsize=None)
+def cache_is_sorted(path, column):
+    """Whether a column of a cache file is in ascending order (checked once per file version)"""
+    values = pl.read_ipc(path, columns=[column])[column]
+    return values.null_count() == 0 and values.is_sorted()
+
+
+def with_sorted_flag(frame, name, is_sorted):
+    """Mark the dataset's sort column as sorted, if it really is"""
+    column = SORTED_BY.get(name)
+    if column is None or not is_sorted(column):
+        return frame
+    return frame.with_columns(pl.col(column).set_sorted())
+
+
+def share_categories():
+    """Let Categorical columns loaded from different files be joined directly
+
+    Polars 1.x keeps a separate category mapping per column unless the global
+    string cache is on; from 2.0 (pl.Categories) categoricals share one mapping
+    already and the string cache is deprecated.
+    """
+    if not hasattr(pl, "Categories"):
+        pl.enable_string_cache()
+
+
+def load_dataset(datasets_dir, name, fmt=None, cache=True):
+    """Load a dataset with its declared schema, reusing the parse cache"""
+    if name not in SCHEMAS:
+        raise KeyError(f"No declared schema for dataset {name!r}")
+    share_categories()
+    if not cache:
+        df = parse_dataset(datasets_dir, name, data_format(name, fmt))
+        return with_sorted_flag(df, name, lambda col: df[col].null_count() == 0 and df[col].is_sorted())
+    path = cached_path(datasets_dir, name, fmt)
+    return with_sorted_flag(pl.read_ipc(path), name, lambda col: cache_is_sorted(path, col))
+
+
+def scan_typed(datasets_dir, name, fmt=None):
+    """Lazily scan the typed IPC cache of a dataset"""
+    if name not in SCHEMAS:
+        raise KeyError(f"No declared schema for dataset {name!r}")
+    share_categories()
+    path = cached_path(datasets_dir, name, fmt)
+    return with_sorted_flag(pl.scan_ipc(path), name, lambda col: cache_is_sorted(path, col))
@@ -0,0 +1,132 @@
+"""
+materialized.py
+Materialized per-key aggregates, maintained incrementally from transaction batches.
+
+Totals such as group_by("client_id").agg(pl.sum("amount")) are usually
+recomputed from every raw transaction. A materialized view stores, per key
+and value column, five measures that merge exactly:
+
+    <value>_sum, <value>_count, <value>_min, <value>_max, <value>_sum_sq
+
+update() aggregates only the new batch to the same measures and merges it into
+each stored view (sums and counts add, min/max take the min/max), so the cost
+of an update depends on the batch, not on the history. Totals, means and
+variances are then derived from the view alone (view_statistics()); the fact
+table is never scanned again.
+
+Views live in one directory as Arrow IPC files, one per view, next to a
+state.json that records the keys of each view and the ids of the batches
+already applied, so re-delivering a batch does not count it twice.
+"""
+import os
+import json
+
+import polars as pl
+
+# View name -> key columns
+VIEWS = {"client_totals": ["client_id"], "asset_totals": ["asset_id"]}
+VALUES = ["amount"]
+STATE_FILE = "state.json"
+
+MEASURE_AGGS = {
+    "sum": lambda col: pl.col(col).sum(),
+    "count": lambda col: pl.col(col).count(),
+    "min": lambda col: pl.col(col).min(),
+    "max": lambda col: pl.col(col).max(),
+    "sum_sq": lambda col: (pl.col(col) ** 2).sum(),
+}
+# How two partial aggregates of each measure combine
+MERGE_AGGS = {"sum": pl.sum, "count": pl.sum, "min": pl.min, "max": pl.max, "sum_sq": pl.sum}
+
+
+def aggregate(lf, keys, values=VALUES):
+    """Mergeable measures of lf per key"""
+    return lf.group_by(keys).agg([
+        agg(value).alias(f"{value}_{measure}")
+        for value in values for measure, agg in MEASURE_AGGS.items()
+    ])
+
+
+def merge(view, delta, keys, values=VALUES):
+    """Combine two partial aggregates of the same keys and values"""
+    return (
+        pl.concat([view.lazy(), delta.lazy()], how="vertical_relaxed")
+          .group_by(keys)
+          .agg([
+              MERGE_AGGS[measure](f"{value}_{measure}").alias(f"{value}_{measure}")
+              for value in values for measure in MEASURE_AGGS
+          ])
+    )
+
+
+def view_statistics(view, values=VALUES):
+    """Totals, counts, means and sample variances/standard deviations derived from a view"""
+    exprs = []
+    for value in values:
+        total, count = pl.col(f"{value}_sum"), pl.col(f"{value}_count")
+        variance = (pl.col(f"{value}_sum_sq") - total ** 2 / count) / (count - 1)
+        exprs += [
+            (total / count).alias(f"{value}_mean"),
+            # ddof=1 like Expr.var(); clipped at 0 against rounding in sum_sq - sum^2/n
+            pl.when(count > 1).then(variance.clip(lower_bound=0)).alias(f"{value}_var"),
+        ]
+    stats = view.lazy().with_columns(exprs)
+    return stats.with_columns([pl.col(f"{value}_var").sqrt().alias(f"{value}_std") for value in values])
+
+
+def read_state(out_dir):
+    path = os.path.join(out_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {"views": {}, "values": None, "batches": [], "rows": 0}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_state(out_dir, state):
+    tmp = os.path.join(out_dir, f"{STATE_FILE}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, os.path.join(out_dir, STATE_FILE))
+
+
+def view_path(out_dir, name):
+    return os.path.join(out_dir, f"{name}.arrow")
+
+
+def read_view(out_dir, name):
+    """Stored aggregates of one view"""
+    return pl.read_ipc(view_path(out_dir, name))
+
+
+def update(batch, out_dir, batch_id=None, views=VIEWS, values=VALUES):
+    """Merge one batch of new rows into every view; returns False if batch_id was already applied"""
+    os.makedirs(out_dir, exist_ok=True)
+    state = read_state(out_dir)
+    if batch_id is not None and batch_id in state["batches"]:
+        return False
+    if state["values"] is not None and (state["values"] != list(values) or state["views"] != views):
+        raise ValueError(f"{out_dir} holds views {state['views']} of {state['values']}, "
+                         f"not {views} of {list(values)}")
+
+    deltas = pl.collect_all([aggregate(batch.lazy(), keys, values) for keys in views.values()])
+    for (name, keys), delta in zip(views.items(), deltas):
+        path = view_path(out_dir, name)
+        merged = merge(pl.read_ipc(path), delta, keys, values).collect() if os.path.exists(path) else delta
+        tmp = f"{path}.tmp"
+        merged.write_ipc(tmp)
+        os.replace(tmp, path)
+
+    # The state is written last: a view is never missing a batch the state lists
+    state.update(views=views, values=list(values), rows=state["rows"] + batch.height)
+    if batch_id is not None:
+        state["batches"].append(batch_id)
+    write_state(out_dir, state)
+    return True
+
+
+def query_view(out_dir, name, where=None, values=VALUES):
+    """Statistics per key of a view, optionally filtered on {column: value}"""
+    stats = view_statistics(pl.scan_ipc(view_path(out_dir, name)), values)
+    for column, value in (where or {}).items():
+        stats = stats.filter(pl.col(column) == value)
+    return stats.collect()
@@ -0,0 +1,64 @@
+"""
+performance.py
+Per-portfolio daily performance and Sharpe ratios as lazy queries.
+
+02_intermediate/02_portfolio_performance.py computes one firm-wide daily
+series and its Sharpe ratio in Python. daily_performance() and
+performance_summary() compute the same metrics for every portfolio at once,
+where a portfolio is any set of key columns (client_id, or client_id and
+asset_type): daily trade value, cumulative value, daily return, volatility and
+annualized Sharpe. Window steps run per key with .over(keys), the summary is a
+grouped aggregation, so nothing leaves the lazy plan and both can be collected
+together with the streaming engine.
+"""
+import polars as pl
+
+TRADING_DAYS = 252
+
+
+def trade_values(tx, assets):
+    """Transactions joined to asset prices, with trade_value and trade_date"""
+    return (
+        tx.join(assets, on="asset_id", how="inner")
+          .with_columns([
+              (pl.col("amount") * pl.col("price")).alias("trade_value"),
+              pl.col("date").dt.date().alias("trade_date"),
+          ])
+    )
+
+
+def daily_performance(trades, keys):
+    """Daily value, cumulative value and daily return per portfolio"""
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    return (
+        trades.group_by(keys + ["trade_date"])
+              .agg([
+                  pl.sum("trade_value").alias("daily_trade_value"),
+                  pl.len().alias("num_trades"),
+              ])
+              .sort(keys + ["trade_date"])
+              .with_columns(pl.col("daily_trade_value").cum_sum().over(keys).alias("cumulative_value"))
+              .with_columns(
+                  (pl.col("daily_trade_value") / pl.col("cumulative_value").shift(1).over(keys) * 100)
+                  .alias("daily_return_pct")
+              )
+    )
+
+
+def performance_summary(daily, keys):
+    """Average return, volatility and annualized Sharpe ratio per portfolio"""
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    return (
+        daily.group_by(keys)
+             .agg([
+                 pl.len().alias("num_days"),
+                 pl.sum("daily_trade_value").alias("total_trade_value"),
+                 pl.mean("daily_return_pct").alias("avg_daily_return_pct"),
+                 pl.std("daily_return_pct").alias("daily_volatility_pct"),
+             ])
+             .with_columns(
+                 (pl.col("avg_daily_return_pct") / pl.col("daily_volatility_pct") * TRADING_DAYS ** 0.5)
+                 .alias("sharpe_ratio")
+             )
+             .sort(keys)
+    )
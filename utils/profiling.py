@@ -0,0 +1,142 @@
+"""
+profiling.py
+Per-node timings for lazy queries, as a table and as a Chrome trace.
+
+profile_queries() times every node of each LazyFrame's plan. Where
+LazyFrame.profile() exists (Polars before 2.0) it is used: it executes the
+query on the in-memory engine and records when every node of the physical plan
+started and finished (microseconds since the query began).
+
+Polars 2.0 removed LazyFrame.profile() and has no other per-node timings, so
+there the logical plan is split into its sub-plans instead: every node, with
+everything below it, is rebuilt from the JSON form of the plan and collected on
+its own (median of `repeat` runs). That is the node's inclusive time; its self
+time is what remains after subtracting its inputs. In the table and the trace
+each node spans its inclusive time with its inputs nested inside it. A sub-plan
+is optimized on its own, so for example a scan below a filter is timed without
+the filter pushed into it.
+
+write_chrome_trace() turns the timings into the Chrome trace event format: open
+the JSON in chrome://tracing or https://ui.perfetto.dev to see each query as a
+flame chart, one row per query.
+"""
+import io
+import json
+import time
+import warnings
+from statistics import median
+
+import polars as pl
+
+# Longest node label kept from the plan text
+NODE_LABEL_CHARS = 60
+
+
+def has_engine_profiler():
+    """Whether this Polars version has LazyFrame.profile() (before 2.0)"""
+    return hasattr(pl.LazyFrame, "profile")
+
+
+def engine_timings(lf):
+    """(node, start, end, self) rows from LazyFrame.profile()"""
+    _, timings = lf.profile()
+    return [(node, start, end, end - start) for node, start, end in timings.rows()]
+
+
+def plan_inputs(node):
+    """Input sub-plans of one node of a JSON logical plan"""
+    (_, body), = node.items()
+    inputs = []
+    if isinstance(body, dict):
+        for key, value in body.items():
+            if key.startswith("input"):
+                inputs += value if isinstance(value, list) else [value]
+    return inputs
+
+
+def time_subplan(node, repeat):
+    """Label and median collect time (us) of the sub-plan rooted at node"""
+    lf = pl.LazyFrame.deserialize(io.StringIO(json.dumps(node)), format="json")
+    lines = [line.strip() for line in lf.explain(optimized=False).splitlines()]
+    # "WITH_COLUMNS:" or "INNER JOIN:" say what follows on the next line
+    label = f"{lines[0]} {lines[1]}" if lines[0].endswith(":") and len(lines) > 1 else lines[0]
+    label = label[:NODE_LABEL_CHARS]
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        lf.collect()
+        times.append((time.perf_counter_ns() - start) // 1000)
+    return label, int(median(times))
+
+
+def subplan_timings(lf, repeat=3):
+    """(node, start, end, self) rows from timing every sub-plan of lf"""
+    with warnings.catch_warnings():
+        # The JSON format is deprecated but is the only one that can be taken apart
+        warnings.simplefilter("ignore")
+        try:
+            plan = json.loads(lf.serialize(format="json"))
+        except Exception as e:
+            raise RuntimeError(f"Cannot split this plan into sub-plans to profile it: {e}") from e
+
+        rows = []
+
+        def visit(node, start):
+            # Inputs run first, one after another, inside the node's span
+            label, inclusive = time_subplan(node, repeat)
+            row = len(rows)
+            rows.append(None)
+            cursor = start
+            for child in plan_inputs(node):
+                cursor = visit(child, cursor)
+            end = max(start + inclusive, cursor)
+            rows[row] = (label, start, end, end - cursor)
+            return end
+
+        visit(plan, 0)
+    return rows
+
+
+def profile_query(name, lf, repeat=3):
+    """Per-node timings of one lazy query"""
+    rows = engine_timings(lf) if has_engine_profiler() else subplan_timings(lf, repeat)
+    return pl.DataFrame(
+        rows, schema={"node": pl.String, "start_us": pl.Int64, "end_us": pl.Int64, "self_us": pl.Int64},
+        orient="row",
+    ).select([
+        pl.lit(name).alias("query"),
+        "node",
+        "start_us",
+        "end_us",
+        (pl.col("end_us") - pl.col("start_us")).alias("duration_us"),
+        "self_us",
+    ])
+
+
+def profile_queries(queries, repeat=3):
+    """Profile a {name: LazyFrame} mapping into one timings table"""
+    return pl.concat([profile_query(name, lf, repeat) for name, lf in queries.items()])
+
+
+def chrome_trace(timings):
+    """Chrome trace events: one thread (row) per query, one slice per plan node"""
+    events = []
+    for tid, (query,) in enumerate(timings.select("query").unique(maintain_order=True).rows(), 1):
+        events.append({
+            "name": "thread_name", "ph": "M", "pid": 1, "tid": tid,
+            "args": {"name": query},
+        })
+        for node, start, duration in (
+            timings.filter(pl.col("query") == query)
+                   .select("node", "start_us", "duration_us").rows()
+        ):
+            events.append({
+                "name": node, "cat": "polars", "ph": "X", "pid": 1, "tid": tid,
+                "ts": start, "dur": duration,
+            })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(timings, path):
+    with open(path, "w") as f:
+        json.dump(chrome_trace(timings), f)
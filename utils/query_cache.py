@@ -0,0 +1,184 @@
+"""
+query_cache.py
+Memoized collect() for lazy queries, cached in memory and as Arrow IPC on disk.
+
+QueryCache.collect(lf) returns a cached result when the same query ran before
+over unchanged inputs. The cache key hashes
+
+- the optimized plan (lf.explain()) together with the serialized logical plan
+  (lf.serialize()), which also captures in-memory DataFrames in the plan, and
+- a fingerprint of every file the plan scans: mtime and size, or a content
+  hash with hash_inputs=True. Editing or regenerating an input changes the
+  key, so stale results are never returned.
+
+The files are not taken from the plan text, which abbreviates multi-file
+scans to "[part-0.parquet, ... N other sources]". Instead the paths and globs
+given to each scan are read from the JSON form of the logical plan and
+expanded, so every matching file is fingerprinted and a new file that matches
+a glob also changes the key.
+
+Results live in an in-memory LRU bounded by max_memory_mb and in IPC files
+under cache_dir bounded by max_disk_mb (least recently used files are removed
+first). stats() reports memory hits, disk hits, misses and evictions. Plans
+that cannot be serialized (for example with Python UDFs) are collected
+normally and counted as uncacheable.
+"""
+import os
+import re
+import glob
+import json
+import hashlib
+import warnings
+from collections import OrderedDict
+
+import polars as pl
+
+from utils.loader import source_hash
+
+# Node ids and dynamic predicate ids printed by some Polars versions; they
+# change on every explain()
+NODE_ID_PATTERN = re.compile(r"\s*\[id: \d+\]")
+DYNAMIC_PRED_PATTERN = re.compile(r"dynamic_pred: [0-9a-f-]{36}")
+
+
+def plan_text(lf):
+    """Optimized plan as text, without per-run ids"""
+    text = NODE_ID_PATTERN.sub("", lf.explain())
+    return DYNAMIC_PRED_PATTERN.sub("dynamic_pred", text)
+
+
+def source_patterns(node):
+    """Paths and globs given to every scan in a JSON logical plan"""
+    if isinstance(node, list):
+        return [pattern for item in node for pattern in source_patterns(item)]
+    if not isinstance(node, dict):
+        return []
+    sources = node.get("sources")
+    if isinstance(sources, dict) and "Paths" in sources:
+        # A plain string, or {"inner": path} in newer Polars versions
+        return [p["inner"] if isinstance(p, dict) else p for p in sources["Paths"]]
+    return [pattern for value in node.values() for pattern in source_patterns(value)]
+
+
+def scanned_paths(lf):
+    """Every file and directory the plan reads, with globs expanded"""
+    with warnings.catch_warnings():
+        # The JSON format is deprecated but is the only one that can be inspected
+        warnings.simplefilter("ignore")
+        plan = json.loads(lf.serialize(format="json"))
+    paths = set()
+    for pattern in source_patterns(plan):
+        if glob.has_magic(pattern):
+            paths.update(glob.glob(pattern, recursive=True))
+        elif os.path.exists(pattern):
+            paths.add(pattern)
+    return sorted(paths)
+
+
+def input_fingerprint(paths, hash_inputs=False):
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        digest.update(path.encode())
+        if hash_inputs:
+            digest.update(source_hash(path).encode())
+            continue
+        files = sorted(glob.glob(os.path.join(path, "**", "*.*"), recursive=True)) if os.path.isdir(path) else [path]
+        for file in files:
+            stat = os.stat(file)
+            digest.update(f"{file}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    return digest.hexdigest()
+
+
+class QueryCache:
+    """Two-level (memory, disk) LRU cache of lazy query results"""
+
+    def __init__(self, cache_dir, max_memory_mb=256, max_disk_mb=1024, hash_inputs=False):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_mb * 1024 ** 2
+        self.max_disk_bytes = max_disk_mb * 1024 ** 2
+        self.hash_inputs = hash_inputs
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0,
+                         "uncacheable": 0, "memory_evictions": 0, "disk_evictions": 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, lf):
+        """Cache key of a query, or None when the plan cannot be serialized"""
+        try:
+            serialized = lf.serialize()
+            paths = scanned_paths(lf)
+        except Exception:
+            return None
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(plan_text(lf).encode())
+        digest.update(serialized)
+        digest.update(input_fingerprint(paths, self.hash_inputs).encode())
+        return digest.hexdigest()
+
+    def disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.arrow")
+
+    def collect(self, lf, **collect_kwargs):
+        """lf.collect(**collect_kwargs), answered from the cache when possible"""
+        key = self.key(lf)
+        if key is None:
+            self.counters["uncacheable"] += 1
+            return lf.collect(**collect_kwargs)
+
+        if key in self.memory:
+            self.counters["memory_hits"] += 1
+            self.memory.move_to_end(key)
+            return self.memory[key]
+
+        path = self.disk_path(key)
+        if os.path.exists(path):
+            self.counters["disk_hits"] += 1
+            os.utime(path)  # mark as recently used
+            df = pl.read_ipc(path)
+        else:
+            self.counters["misses"] += 1
+            df = lf.collect(**collect_kwargs)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            df.write_ipc(tmp)
+            os.replace(tmp, path)
+            self._evict_disk()
+        self._remember(key, df)
+        return df
+
+    def _remember(self, key, df):
+        size = df.estimated_size()
+        if size > self.max_memory_bytes:
+            return
+        self.memory[key] = df
+        self.memory_bytes += size
+        while self.memory_bytes > self.max_memory_bytes:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_bytes -= evicted.estimated_size()
+            self.counters["memory_evictions"] += 1
+
+    def _evict_disk(self):
+        files = sorted(glob.glob(os.path.join(self.cache_dir, "*.arrow")), key=os.path.getmtime)
+        total = sum(os.path.getsize(f) for f in files)
+        for file in files:
+            if total <= self.max_disk_bytes:
+                break
+            total -= os.path.getsize(file)
+            os.remove(file)
+            self.counters["disk_evictions"] += 1
+
+    def clear(self):
+        self.memory.clear()
+        self.memory_bytes = 0
+        for file in glob.glob(os.path.join(self.cache_dir, "*.arrow")):
+            os.remove(file)
+
+    def stats(self):
+        lookups = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+        hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+        return {
+            **self.counters,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_mb": self.memory_bytes / 1024 ** 2,
+        }
@@ -0,0 +1,126 @@
+"""
+risk.py
+Parametric and Monte Carlo Value at Risk / Expected Shortfall for N-asset portfolios.
+
+Portfolios are columns of a weights matrix (n_assets x n_portfolios), asset
+returns are described by a mean vector and a covariance matrix.
+
+- parametric_var() is the variance-covariance method: portfolio P&L is normal
+  with mean w.mu and variance w' Sigma w, so VaR and ES are closed-form.
+- monte_carlo_var() simulates correlated asset returns mu + L z (L L' = Sigma),
+  optionally with Student-t tails, and reads VaR/ES off the simulated P&L.
+  Portfolio P&L only depends on z through L' w, so each batch draws its
+  (batch x n_assets) normals and multiplies by that (n_assets x n_portfolios)
+  projection: the n_assets x n_assets product per scenario is never formed.
+  Scenarios are simulated in fixed-size batches, which bounds memory, and the
+  batches are spread over a process pool. Every batch gets its own seed from
+  numpy's SeedSequence, so results depend on the seed only, not on the number
+  of workers.
+
+VaR and ES are reported as positive losses.
+"""
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+DEFAULT_BATCH_SIZE = 4_096
+
+_loadings = None
+_offset = None
+_t_dof = None
+
+
+def as_weights(weights):
+    """Weights as an (n_assets x n_portfolios) matrix"""
+    weights = np.asarray(weights, dtype=float)
+    return weights[:, None] if weights.ndim == 1 else weights
+
+
+def cholesky_factor(cov):
+    """L with L L' = cov; falls back to a clipped eigendecomposition when cov is not positive definite"""
+    cov = np.asarray(cov, dtype=float)
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        # Sample covariances from fewer observations than assets are only semi-definite
+        values, vectors = np.linalg.eigh(cov)
+        return vectors * np.sqrt(np.clip(values, 0, None))
+
+
+def estimate(returns):
+    """Mean vector and covariance matrix from a (n_days x n_assets) return matrix"""
+    returns = np.asarray(returns, dtype=float)
+    return returns.mean(axis=0), np.cov(returns, rowvar=False)
+
+
+def parametric_var(weights, mean, cov, confidence=0.99, value=1.0):
+    """Variance-covariance VaR and ES per portfolio"""
+    weights = as_weights(weights)
+    mu = value * (np.asarray(mean) @ weights)
+    sigma = value * np.sqrt(np.einsum("ip,ij,jp->p", weights, np.asarray(cov), weights))
+    normal = NormalDist()
+    z = normal.inv_cdf(confidence)
+    return {
+        "var": sigma * z - mu,
+        "es": sigma * normal.pdf(z) / (1 - confidence) - mu,
+    }
+
+
+def tail_measures(pnl, confidence):
+    """Historical-style VaR and ES from a (n_scenarios x n_portfolios) P&L matrix"""
+    cutoff = np.quantile(pnl, 1 - confidence, axis=0)
+    tail = np.where(pnl <= cutoff, pnl, np.nan)
+    return {"var": -cutoff, "es": -np.nanmean(tail, axis=0)}
+
+
+def _init_worker(loadings, offset, t_dof):
+    global _loadings, _offset, _t_dof
+    _loadings, _offset, _t_dof = loadings, offset, t_dof
+
+
+def _simulate_batch(task):
+    """Portfolio P&L for one batch of scenarios"""
+    seed, size = task
+    rng = np.random.default_rng(seed)
+    shocks = rng.standard_normal((size, _loadings.shape[0])) @ _loadings
+    if _t_dof is not None:
+        # Multivariate Student-t: one chi-square mixing variable per scenario, scaled to unit variance
+        mixing = np.sqrt((_t_dof - 2) / rng.chisquare(_t_dof, size))
+        shocks *= mixing[:, None]
+    return _offset + shocks
+
+
+def simulate_pnl(weights, mean, cov, n_scenarios, value=1.0, t_dof=None,
+                 batch_size=DEFAULT_BATCH_SIZE, workers=None, seed=42):
+    """Simulated P&L, shape (n_scenarios x n_portfolios)"""
+    weights = as_weights(weights)
+    loadings = value * (cholesky_factor(cov).T @ weights)
+    offset = value * (np.asarray(mean) @ weights)
+    sizes = [batch_size] * (n_scenarios // batch_size)
+    if n_scenarios % batch_size:
+        sizes.append(n_scenarios % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = list(zip(seeds, sizes))
+
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        _init_worker(loadings, offset, t_dof)
+        batches = [_simulate_batch(task) for task in tasks]
+    else:
+        # Spawned, not forked: callers have usually loaded data with Polars first,
+        # and forking a process whose Polars thread pool is running can deadlock
+        spawn = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=spawn, initializer=_init_worker,
+                                 initargs=(loadings, offset, t_dof)) as pool:
+            batches = list(pool.map(_simulate_batch, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+    return np.concatenate(batches)
+
+
+def monte_carlo_var(weights, mean, cov, n_scenarios=100_000, confidence=0.99, value=1.0,
+                    t_dof=None, batch_size=DEFAULT_BATCH_SIZE, workers=None, seed=42):
+    """Monte Carlo VaR and ES per portfolio (normal, or Student-t with t_dof degrees of freedom)"""
+    pnl = simulate_pnl(weights, mean, cov, n_scenarios, value, t_dof, batch_size, workers, seed)
+    return tail_measures(pnl, confidence)
@@ -0,0 +1,119 @@
+"""
+risk_attribution.py
+Component, marginal and incremental VaR / Expected Shortfall per position.
+
+historical_attribution() works on a long return panel (date, asset, return)
+and a weights table (asset, weight), the unpivoted form of a wide
+(date, asset1, asset2, ...) frame. Every quantity comes from the one
+(date, asset) contribution frame value * weight * return, joined once with the
+portfolio P&L per date:
+
+- component ES: average contribution of each position over the tail dates
+  (portfolio P&L at or below the VaR cutoff); components sum to the ES.
+- component VaR: average contribution over the dates ranked closest to the
+  VaR cutoff, rescaled so the components sum to the VaR.
+- marginal VaR / ES: component divided by the position's dollar exposure, the
+  change in VaR per extra dollar in that position.
+- incremental VaR / ES: VaR of the portfolio minus VaR without the position,
+  from a grouped quantile of (portfolio P&L - contribution) per asset.
+
+No frame is copied per asset, so thousands of positions cost one join and a
+few grouped aggregations. parametric_attribution() is the closed-form
+(variance-covariance) counterpart for a mean vector and covariance matrix.
+"""
+from statistics import NormalDist
+
+import numpy as np
+import polars as pl
+
+
+def contributions(returns, weights, value=1.0):
+    """Dollar P&L of every position on every date"""
+    return (
+        returns.lazy()
+               .join(weights.lazy(), on="asset", how="inner")
+               .select([
+                   "date", "asset",
+                   (value * pl.col("weight")).alias("exposure"),
+                   (value * pl.col("weight") * pl.col("return")).alias("pnl"),
+               ])
+    )
+
+
+def historical_attribution(returns, weights, confidence=0.99, value=1.0, neighbors=5):
+    """Per-asset component, marginal and incremental VaR/ES from a long (date, asset, return) panel"""
+    contrib = contributions(returns, weights, value).collect()
+    portfolio = contrib.group_by("date").agg(pl.sum("pnl").alias("portfolio_pnl"))
+    n_days = portfolio.height
+
+    cutoff = portfolio["portfolio_pnl"].quantile(1 - confidence)
+    var = -cutoff
+    tail = portfolio.filter(pl.col("portfolio_pnl") <= cutoff)
+    es = -tail["portfolio_pnl"].mean()
+
+    # Flag the tail dates and the dates ranked within `neighbors` of the VaR cutoff
+    cutoff_rank = (1 - confidence) * (n_days - 1)
+    portfolio = (
+        portfolio.sort("portfolio_pnl")
+                 .with_row_index("rank")
+                 .with_columns([
+                     (pl.col("portfolio_pnl") <= cutoff).alias("in_tail"),
+                     ((pl.col("rank").cast(pl.Float64) - cutoff_rank).abs() <= neighbors).alias("near_var"),
+                 ])
+    )
+
+    reduced = pl.col("portfolio_pnl") - pl.col("pnl")
+    reduced_cutoff = reduced.quantile(1 - confidence)
+    per_asset = contrib.join(portfolio, on="date").group_by("asset").agg([
+        pl.first("exposure"),
+        (-pl.col("pnl").filter(pl.col("in_tail")).sum() / tail.height).alias("component_ES"),
+        (-pl.col("pnl").filter(pl.col("near_var")).mean()).alias("_component_VaR_raw"),
+        (-reduced_cutoff).alias("_var_without"),
+        (-reduced.filter(reduced <= reduced_cutoff).mean()).alias("_es_without"),
+    ])
+    return (
+        per_asset
+        .with_columns(
+            (pl.col("_component_VaR_raw") * var / pl.col("_component_VaR_raw").sum()).alias("component_VaR")
+        )
+        .with_columns([
+            (pl.col("component_VaR") / pl.col("exposure")).alias("marginal_VaR"),
+            (pl.col("component_ES") / pl.col("exposure")).alias("marginal_ES"),
+            (var - pl.col("_var_without")).alias("incremental_VaR"),
+            (es - pl.col("_es_without")).alias("incremental_ES"),
+        ])
+        .select(["asset", "exposure", "component_VaR", "marginal_VaR", "incremental_VaR",
+                 "component_ES", "marginal_ES", "incremental_ES"])
+        .sort("asset")
+    ), {"VaR": var, "ES": es}
+
+
+def parametric_attribution(weights, mean, cov, confidence=0.99, value=1.0):
+    """Closed-form (Euler) component, marginal and incremental VaR/ES per asset"""
+    weights = np.asarray(weights, dtype=float)
+    mean = np.asarray(mean, dtype=float)
+    cov = np.asarray(cov, dtype=float)
+    normal = NormalDist()
+    z = normal.inv_cdf(confidence)
+    es_scale = normal.pdf(z) / (1 - confidence)
+
+    cov_w = cov @ weights
+    sigma = np.sqrt(weights @ cov_w)
+    var = value * (z * sigma - mean @ weights)
+    es = value * (es_scale * sigma - mean @ weights)
+
+    marginal_var = z * cov_w / sigma - mean
+    marginal_es = es_scale * cov_w / sigma - mean
+    # Portfolio variance without asset i, for every i at once
+    sigma_without = np.sqrt(np.clip(sigma ** 2 - 2 * weights * cov_w + weights ** 2 * np.diag(cov), 0, None))
+    mean_without = mean @ weights - weights * mean
+    return {
+        "VaR": var,
+        "ES": es,
+        "marginal_VaR": marginal_var,
+        "component_VaR": value * weights * marginal_var,
+        "incremental_VaR": var - value * (z * sigma_without - mean_without),
+        "marginal_ES": marginal_es,
+        "component_ES": value * weights * marginal_es,
+        "incremental_ES": es - value * (es_scale * sigma_without - mean_without),
+    }
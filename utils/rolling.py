@@ -0,0 +1,172 @@
+"""
+rolling.py
+Rolling statistics: incremental updates of one series and a multi-series panel mode.
+
+The statistics match 02_intermediate/01_time_series_and_rolling.py:
+rolling_mean(7), rolling_std(30) and ewm_mean(alpha=0.2). Recomputing them over
+the full history on every append costs O(history). Here the output is a
+directory of part files plus a small state.json holding:
+
+- the last WINDOW_TAIL returns, enough to evaluate both rolling windows for
+  the next rows, and
+- the numerator and denominator of the adjusted EWMA, so the EWMA continues
+  from where it stopped instead of restarting.
+
+update() reads only the state, computes the new rows and writes them as one
+new part file, so each append costs O(new rows).
+
+panel_rolling() computes the same kind of statistics for many series at once
+from a long (id, date, value) frame, with calendar-time windows.
+"""
+import os
+import glob
+import json
+from datetime import datetime
+
+import polars as pl
+
+from utils.storage import EXTENSIONS, data_format, write_frame
+
+VALUE_COL = "benchmark_return"
+MEAN_WINDOW = 7
+STD_WINDOW = 30
+EWM_ALPHA = 0.2
+# Past values needed to evaluate the longest window for the next row
+WINDOW_TAIL = max(MEAN_WINDOW, STD_WINDOW) - 1
+STATE_FILE = "state.json"
+STAT_COLUMNS = ["rolling_mean_7d", "rolling_std_30d", "ewma_alpha_0.2"]
+
+
+def rolling_exprs():
+    return [
+        pl.col(VALUE_COL).rolling_mean(window_size=MEAN_WINDOW).alias("rolling_mean_7d"),
+        pl.col(VALUE_COL).rolling_std(window_size=STD_WINDOW).alias("rolling_std_30d"),
+    ]
+
+
+def full_recompute(series):
+    """Reference implementation: every statistic over the whole history"""
+    return series.sort("date").with_columns(
+        rolling_exprs() + [pl.col(VALUE_COL).ewm_mean(alpha=EWM_ALPHA).alias("ewma_alpha_0.2")]
+    )
+
+
+def ewm_update(values, num, den):
+    """Continue an adjusted EWMA from state (num, den) over new values.
+
+    With decay d = 1 - alpha the adjusted EWMA is num_t / den_t where
+    num_t = x_t + d * num_{t-1} and den_t = 1 + d * den_{t-1}. Over k new rows the
+    state contributes d**k * num and d**k * den, and the rows themselves
+    contribute a fresh adjusted EWMA scaled back to a weighted sum.
+    """
+    decay = 1 - EWM_ALPHA
+    k = pl.int_range(1, pl.len() + 1).cast(pl.Float64)
+    local_den = (1 - decay ** k) / EWM_ALPHA
+    local_num = pl.col(VALUE_COL).ewm_mean(alpha=EWM_ALPHA) * local_den
+    new = values.with_columns([
+        (local_num + decay ** k * num).alias("_num"),
+        (local_den + decay ** k * den).alias("_den"),
+    ]).with_columns((pl.col("_num") / pl.col("_den")).alias("ewma_alpha_0.2"))
+    return new.drop("_num", "_den"), new["_num"][-1], new["_den"][-1]
+
+
+def compute_rows(new_rows, state):
+    """Statistics for new_rows, given the state left by the previous batch"""
+    tail = pl.DataFrame(
+        {"date": [None] * len(state["tail"]), VALUE_COL: state["tail"]},
+        schema=new_rows.select("date", VALUE_COL).schema,
+    )
+    n_tail = tail.height
+    window = pl.concat([tail, new_rows.select("date", VALUE_COL)])
+    stats = window.with_columns(rolling_exprs()).slice(n_tail)
+    stats, num, den = ewm_update(stats, state["ewm_num"], state["ewm_den"])
+    new_state = {
+        "last_date": stats["date"][-1].isoformat(),
+        "tail": window[VALUE_COL].tail(WINDOW_TAIL).to_list(),
+        "ewm_num": num,
+        "ewm_den": den,
+        "parts": state["parts"] + 1,
+    }
+    return stats, new_state
+
+
+def read_state(out_dir):
+    path = os.path.join(out_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_state(out_dir, state):
+    tmp = os.path.join(out_dir, f"{STATE_FILE}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, os.path.join(out_dir, STATE_FILE))
+
+
+def empty_state():
+    return {"last_date": None, "tail": [], "ewm_num": 0.0, "ewm_den": 0.0, "parts": 0}
+
+
+def unseen_rows(series, out_dir):
+    """Rows of series dated after the last appended row"""
+    state = read_state(out_dir)
+    if state is None:
+        return series
+    return series.filter(pl.col("date") > datetime.fromisoformat(state["last_date"]))
+
+
+def update(new_rows, out_dir, fmt=None):
+    """Append statistics for new_rows (all later than anything seen) to out_dir"""
+    fmt = data_format("rolling_benchmarks", fmt)
+    os.makedirs(out_dir, exist_ok=True)
+    state = read_state(out_dir) or empty_state()
+    new_rows = new_rows.sort("date")
+    if new_rows.is_empty():
+        return new_rows
+    if state["last_date"] is not None and new_rows["date"][0] <= datetime.fromisoformat(state["last_date"]):
+        raise ValueError(
+            f"New rows start at {new_rows['date'][0]}, not after the last appended "
+            f"date {state['last_date']}"
+        )
+    stats, new_state = compute_rows(new_rows, state)
+    # The part file is written before the state, so a crash never skips rows
+    write_frame(stats, os.path.join(out_dir, f"part-{state['parts']:06d}.{EXTENSIONS[fmt]}"), fmt)
+    write_state(out_dir, new_state)
+    return stats
+
+
+def scan(out_dir, fmt=None):
+    """Lazily scan all appended parts in order"""
+    fmt = data_format("rolling_benchmarks", fmt)
+    paths = sorted(glob.glob(os.path.join(out_dir, f"part-*.{EXTENSIONS[fmt]}")))
+    if fmt == "csv":
+        # A part can hold only the first rows of a window, all null: declare the
+        # statistic columns so they are not inferred as strings
+        floats = {VALUE_COL: pl.Float64, **{col: pl.Float64 for col in STAT_COLUMNS}}
+        return pl.concat([pl.scan_csv(p, try_parse_dates=True, schema_overrides=floats) for p in paths])
+    if fmt == "parquet":
+        return pl.scan_parquet(paths)
+    return pl.scan_ipc(paths)
+
+
+def panel_rolling(frame, id_col="id", date_col="date", value_col="return",
+                  mean_window="7d", std_window="30d", alpha=EWM_ALPHA):
+    """Rolling mean, rolling std and EWMA for every series of a long (id, date, value) panel.
+
+    All series are handled in one vectorized pass: each statistic is evaluated
+    per id with .over(id_col). The mean and std windows are calendar durations
+    ("7d", "30d") measured on date_col, so gaps in a series shrink the window
+    instead of stretching it over more days. Input sorted by (id, date) keeps
+    every series contiguous and its dates already ordered, so no re-sort is
+    needed; works on DataFrames and LazyFrames alike.
+    """
+    value = pl.col(value_col)
+    return frame.with_columns([
+        value.rolling_mean_by(date_col, window_size=mean_window).over(id_col)
+             .alias(f"rolling_mean_{mean_window}"),
+        value.rolling_std_by(date_col, window_size=std_window).over(id_col)
+             .alias(f"rolling_std_{std_window}"),
+        value.ewm_mean(alpha=alpha).over(id_col).alias(f"ewma_alpha_{alpha}"),
+    ])
@@ -0,0 +1,223 @@
+"""
+service.py
+A small asyncio HTTP service answering analytics queries from warm datasets.
+
+The typed datasets are loaded once (utils/loader.py) and kept in memory, so a
+request pays for the query only, never for parsing CSVs. Queries run on a
+bounded thread pool (Polars releases the GIL while it works), which keeps the
+event loop free to accept connections. Identical requests that arrive while
+the same query is still running are coalesced: they await the one execution
+already in flight instead of starting another.
+
+Endpoints (GET, HTTP/1.1 with keep-alive):
+
+    /query/top_clients?n=5&min_amount=1000           top clients by amount (complex_query)
+    /query/client_totals?client_id=C0001&n=10        trade value and count per client
+    /query/attribution?by=region&year=2020&month=1   attribution slice by asset_type or region
+    /stats                                           request, execution and coalescing counters
+    /health
+
+Add format=arrow (or Accept: application/vnd.apache.arrow.stream) for an
+Arrow IPC stream instead of JSON.
+
+The HTTP handling is deliberately minimal (standard library only) and meant
+for a local service behind internal dashboards, not the open internet.
+"""
+import io
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+import polars as pl
+
+from utils.loader import load_dataset
+
+CONTENT_TYPES = {"json": "application/json", "arrow": "application/vnd.apache.arrow.stream"}
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+
+def load_frames(datasets_dir):
+    """Typed datasets kept in memory for the life of the service"""
+    transactions = load_dataset(datasets_dir, "transactions")
+    clients = load_dataset(datasets_dir, "clients")
+    assets = load_dataset(datasets_dir, "assets")
+    trades = (
+        load_dataset(datasets_dir, "cleaned_transactions")
+        .join(assets, on="asset_id", how="inner")
+        .with_columns((pl.col("amount") * pl.col("price")).alias("trade_value"))
+    )
+    return {"transactions": transactions, "clients": clients, "trades": trades.rechunk()}
+
+
+def top_clients(frames, params):
+    """Clients with the largest total amount over min_amount (complex_query in 02_lazyframe_optimizations)"""
+    n = int(params.get("n", 5))
+    min_amount = float(params.get("min_amount", 1000))
+    return (
+        frames["transactions"].lazy()
+        .join(frames["clients"].lazy(), on="client_id")
+        .filter(pl.col("amount") > min_amount)
+        .group_by(["client_id", "name"])
+        .agg([
+            pl.sum("amount").alias("total_amount"),
+            pl.len().alias("transaction_count"),
+        ])
+        .sort("total_amount", descending=True)
+        .limit(n)
+        .collect()
+    )
+
+
+def client_totals(frames, params):
+    """Trade value, trade count and first/last trade per client, largest first"""
+    lf = frames["trades"].lazy()
+    if "client_id" in params:
+        lf = lf.filter(pl.col("client_id") == params["client_id"])
+    totals = (
+        lf.group_by("client_id")
+          .agg([
+              pl.sum("trade_value").alias("total_value"),
+              pl.len().alias("num_trades"),
+              pl.min("date").alias("first_trade"),
+              pl.max("date").alias("last_trade"),
+          ])
+          .sort("total_value", descending=True)
+    )
+    if "n" in params:
+        totals = totals.limit(int(params["n"]))
+    return totals.collect()
+
+
+def attribution(frames, params):
+    """Trade value attribution by asset_type or region, optionally for one year/month/bucket"""
+    by = params.get("by", "asset_type")
+    if by not in ("asset_type", "region"):
+        raise ValueError(f"by must be asset_type or region, not {by!r}")
+    lf = frames["trades"].lazy()
+    for dim in ("asset_type", "region"):
+        if dim in params:
+            lf = lf.filter(pl.col(dim).cast(pl.String) == params[dim])
+    if "year" in params:
+        lf = lf.filter(pl.col("date").dt.year() == int(params["year"]))
+    if "month" in params:
+        lf = lf.filter(pl.col("date").dt.month() == int(params["month"]))
+    return (
+        lf.group_by(by)
+          .agg([
+              pl.sum("trade_value").alias("total_value"),
+              pl.len().alias("num_trades"),
+          ])
+          .with_columns((pl.col("total_value") / pl.col("total_value").sum() * 100).alias("pct_attribution"))
+          .sort(by)
+          .collect()
+    )
+
+
+QUERIES = {"top_clients": top_clients, "client_totals": client_totals, "attribution": attribution}
+
+
+def encode(df, fmt):
+    """Response body for a result: JSON records or an Arrow IPC stream"""
+    if fmt == "arrow":
+        buffer = io.BytesIO()
+        df.write_ipc_stream(buffer)
+        return buffer.getvalue()
+    return df.write_json().encode()
+
+
+class QueryService:
+    """Warm frames, a bounded query pool and coalescing of in-flight requests"""
+
+    def __init__(self, frames, max_workers=4):
+        self.frames = frames
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query")
+        self.max_workers = max_workers
+        self.inflight = {}
+        self.counters = {"requests": 0, "executions": 0, "coalesced": 0, "errors": 0}
+
+    async def execute(self, name, params):
+        """Result of a query, shared with identical requests already running"""
+        key = (name, tuple(sorted(params.items())))
+        future = self.inflight.get(key)
+        if future is None:
+            self.counters["executions"] += 1
+            future = asyncio.get_running_loop().run_in_executor(self.pool, QUERIES[name], self.frames, params)
+            self.inflight[key] = future
+            future.add_done_callback(lambda _: self.inflight.pop(key, None))
+        else:
+            self.counters["coalesced"] += 1
+        # A client that disconnects must not cancel the execution others are waiting for
+        return await asyncio.shield(future)
+
+    async def dispatch(self, method, target, headers):
+        """(status, content type, body) for one request"""
+        if method != "GET":
+            return 405, "json", b'{"error": "only GET is supported"}'
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        if url.path == "/health":
+            return 200, "json", b'{"status": "ok"}'
+        if url.path == "/stats":
+            return 200, "json", json.dumps(self.stats()).encode()
+        name = url.path[len("/query/"):] if url.path.startswith("/query/") else None
+        if name not in QUERIES:
+            return 404, "json", json.dumps({"error": f"unknown path {url.path}"}).encode()
+
+        self.counters["requests"] += 1
+        accept_arrow = CONTENT_TYPES["arrow"] in headers.get("accept", "")
+        fmt = params.pop("format", "arrow" if accept_arrow else "json")
+        if fmt not in CONTENT_TYPES:
+            return 400, "json", json.dumps({"error": f"unknown format {fmt!r}"}).encode()
+        try:
+            df = await self.execute(name, params)
+            body = await asyncio.get_running_loop().run_in_executor(self.pool, encode, df, fmt)
+        except (ValueError, pl.exceptions.PolarsError) as exc:
+            self.counters["errors"] += 1
+            return 400, "json", json.dumps({"error": str(exc)}).encode()
+        return 200, fmt, body
+
+    async def handle(self, reader, writer):
+        """Serve requests on one connection until the client closes it"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    field, _, value = line.decode("latin-1").partition(":")
+                    headers[field.strip().lower()] = value.strip()
+                if int(headers.get("content-length", 0)):
+                    await reader.readexactly(int(headers["content-length"]))
+
+                try:
+                    status, fmt, body = await self.dispatch(method, target, headers)
+                except Exception as exc:  # keep serving other requests
+                    self.counters["errors"] += 1
+                    status, fmt, body = 500, "json", json.dumps({"error": repr(exc)}).encode()
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: {CONTENT_TYPES[fmt]}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8050):
+        return await asyncio.start_server(self.handle, host, port)
+
+    def stats(self):
+        return {**self.counters, "inflight": len(self.inflight), "workers": self.max_workers}
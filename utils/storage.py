@@ -0,0 +1,195 @@
+"""
+storage.py
+Format-aware reading and writing of the tutorial datasets.
+
+Every dataset is addressed by name ("transactions", "cleaned_transactions", ...)
+rather than by file path. The on-disk format is chosen with the
+LEARN_POLARS_FORMAT environment variable (csv, parquet or ipc); when it is not
+set each dataset keeps its original format (CSV, except the Parquet files).
+
+In the columnar formats the transaction tables are written as a hive layout
+partitioned by year and month:
+
+    transactions/year=2020/month=01/part-00000.parquet
+
+so scan_parquet/scan_ipc can prune whole partitions and read row groups in parallel.
+Months are zero-padded so that the lexicographic file order of a glob is also
+the date order.
+
+Datasets stored in date order (SORTED_BY) are written to Parquet with row
+groups that start and end on day boundaries, with min/max statistics and the
+sort order recorded in the footer, so a date-range read can skip every row
+group outside the range (see utils/date_range.py).
+"""
+import os
+import shutil
+import polars as pl
+import pyarrow.parquet as pq
+
+FORMATS = ("csv", "parquet", "ipc")
+EXTENSIONS = {"csv": "csv", "parquet": "parquet", "ipc": "arrow"}
+
+# Formats used when LEARN_POLARS_FORMAT is not set (the original layout)
+DEFAULT_FORMATS = {
+    "assets": "parquet",
+    "rolling_benchmarks": "parquet",
+}
+
+# Datasets written as year/month hive partitions in the columnar formats
+HIVE_PARTITIONED = {"transactions", "cleaned_transactions"}
+PARTITION_KEYS = ["year", "month"]
+
+# Datasets whose rows are stored in ascending order of a date column
+SORTED_BY = {"transactions": "date", "cleaned_transactions": "date", "benchmarks": "date"}
+# Upper bound on rows per date-aligned row group (a single larger day gets its own group)
+DATE_ROW_GROUP_ROWS = 250_000
+
+
+def data_format(name=None, fmt=None):
+    """Resolve the storage format for a dataset"""
+    fmt = fmt or os.environ.get("LEARN_POLARS_FORMAT") or DEFAULT_FORMATS.get(name, "csv")
+    fmt = fmt.lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown data format {fmt!r}, expected one of {FORMATS}")
+    return fmt
+
+
+def is_hive(name, fmt):
+    return fmt != "csv" and name in HIVE_PARTITIONED
+
+
+def dataset_path(datasets_dir, name, fmt=None):
+    """File (or hive directory) that holds a dataset"""
+    fmt = data_format(name, fmt)
+    if is_hive(name, fmt):
+        return os.path.join(datasets_dir, name)
+    return os.path.join(datasets_dir, f"{name}.{EXTENSIONS[fmt]}")
+
+
+def hive_glob(path, fmt):
+    return os.path.join(path, "**", f"*.{EXTENSIONS[fmt]}")
+
+
+def with_partition_keys(df, date_col="date"):
+    """Add year/month partition columns derived from the date column"""
+    if df.schema[date_col] == pl.String:
+        date = pl.col(date_col).str.to_datetime()
+    else:
+        date = pl.col(date_col)
+    return df.with_columns([
+        date.dt.year().alias("year"),
+        date.dt.month().alias("month"),
+    ])
+
+
+def day_row_groups(dates, max_rows=DATE_ROW_GROUP_ROWS):
+    """(offset, length) of row groups made of whole days of a sorted date Series"""
+    day_lengths = dates.dt.date().rle().struct.field("len").to_list()
+    groups, offset, length = [], 0, 0
+    for day_length in day_lengths:
+        if length and length + day_length > max_rows:
+            groups.append((offset, length))
+            offset, length = offset + length, 0
+        length += day_length
+    if length:
+        groups.append((offset, length))
+    return groups
+
+
+def write_date_aligned_parquet(df, path, date_col, max_rows=DATE_ROW_GROUP_ROWS):
+    """Parquet with day-aligned row groups, statistics and the sort order in the footer"""
+    table = df.to_arrow()
+    sorting = [pq.SortingColumn(df.columns.index(date_col))]
+    with pq.ParquetWriter(path, table.schema, compression="zstd",
+                          write_statistics=True, sorting_columns=sorting) as writer:
+        for offset, length in day_row_groups(df[date_col], max_rows):
+            writer.write_table(table.slice(offset, length), row_group_size=length)
+
+
+def is_date_sorted(df, date_col):
+    return (date_col is not None and date_col in df.columns
+            and df[date_col].null_count() == 0 and df[date_col].is_sorted())
+
+
+def write_frame(df, path, fmt, sorted_by=None):
+    """Write one DataFrame to a single file (date-aligned row groups when sorted_by holds)"""
+    if fmt == "csv":
+        df.write_csv(path)
+    elif fmt == "parquet":
+        if is_date_sorted(df, sorted_by):
+            write_date_aligned_parquet(df, path, sorted_by)
+        else:
+            df.write_parquet(path)
+    else:
+        df.write_ipc(path)
+
+
+def write_hive(df, path, fmt, part=0, sorted_by=None):
+    """Write a DataFrame as year=/month= partitions below path"""
+    if not set(PARTITION_KEYS).issubset(df.columns):
+        df = with_partition_keys(df)
+    for (year, month), group in df.partition_by(PARTITION_KEYS, as_dict=True).items():
+        part_dir = os.path.join(path, f"year={year}", f"month={month:02d}")
+        os.makedirs(part_dir, exist_ok=True)
+        write_frame(
+            group.drop(PARTITION_KEYS),
+            os.path.join(part_dir, f"part-{part:05d}.{EXTENSIONS[fmt]}"),
+            fmt,
+            sorted_by,
+        )
+
+
+def write_dataset(df, datasets_dir, name, fmt=None):
+    """Write a dataset in the configured format, replacing any previous copy"""
+    fmt = data_format(name, fmt)
+    path = dataset_path(datasets_dir, name, fmt)
+    if is_hive(name, fmt):
+        shutil.rmtree(path, ignore_errors=True)
+        write_hive(df, path, fmt, sorted_by=SORTED_BY.get(name))
+    else:
+        write_frame(df, path, fmt, SORTED_BY.get(name))
+    return path
+
+
+def scan_dataset(datasets_dir, name, fmt=None):
+    """Lazily scan a dataset; hive datasets expose year/month as columns"""
+    fmt = data_format(name, fmt)
+    path = dataset_path(datasets_dir, name, fmt)
+    if fmt == "csv":
+        return pl.scan_csv(path)
+    if is_hive(name, fmt):
+        if fmt == "parquet":
+            return pl.scan_parquet(hive_glob(path, fmt), hive_partitioning=True)
+        return pl.scan_ipc(hive_glob(path, fmt), hive_partitioning=True)
+    if fmt == "parquet":
+        return pl.scan_parquet(path)
+    return pl.scan_ipc(path)
+
+
+def read_dataset(datasets_dir, name, fmt=None):
+    """Eagerly read a dataset in the configured format"""
+    fmt = data_format(name, fmt)
+    path = dataset_path(datasets_dir, name, fmt)
+    if fmt == "csv":
+        return pl.read_csv(path)
+    if is_hive(name, fmt):
+        return scan_dataset(datasets_dir, name, fmt).collect()
+    if fmt == "parquet":
+        return pl.read_parquet(path)
+    return pl.read_ipc(path)
+
+
+def read_dataset_pandas(datasets_dir, name, fmt=None):
+    """Read a dataset with pandas, for like-for-like benchmark comparisons"""
+    import pandas as pd
+
+    fmt = data_format(name, fmt)
+    path = dataset_path(datasets_dir, name, fmt)
+    if fmt == "csv":
+        return pd.read_csv(path)
+    if fmt == "parquet":
+        return pd.read_parquet(path)
+    if is_hive(name, fmt):
+        import pyarrow.dataset as ds
+        return ds.dataset(path, format="ipc", partitioning="hive").to_table().to_pandas()
+    return pd.read_feather(path)